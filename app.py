@@ -1,13 +1,87 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from config import GAME_MODES
 from bots import load_bots
+from bots.analysis import AnalysisError, boards_from_fens, boards_from_pgn
+from bots.position_cache import open_position_cache
+from bots.ricardo import ENGINE_VERSION
+from bots.tablebase import open_tablebase
+from engine_pool import EnginePool, uci_command
+from jobs import CANCELLED, DONE, EngineJobQueue, HostSlots, JobQueueFull
+from metrics import Registry
+from sessions import SessionStore
 import chess
+import chess.engine
+import json
 import time
 
 app = Flask(__name__)
 app.config.from_object('config')
 
-BOTS = load_bots()
+TABLEBASE = open_tablebase(app.config['SYZYGY_PATH'],
+                           max_fds=app.config['SYZYGY_MAX_FDS'],
+                           max_pieces=app.config['SYZYGY_PROBE_LIMIT'])
+POSITION_CACHE = open_position_cache(app.config['POSITION_CACHE_PATH'],
+                                     max_entries=app.config['POSITION_CACHE_SIZE'],
+                                     version=ENGINE_VERSION)
+BOTS = load_bots(workers=app.config['ENGINE_WORKERS'], tablebase=TABLEBASE, position_cache=POSITION_CACHE)
+# Con ENGINE_POOL_SIZE > 0 cada bot busca en sus propios procesos UCI
+ENGINE_POOLS = {
+    name: EnginePool(uci_command(name, app.config['SYZYGY_PATH'], app.config['POSITION_CACHE_PATH']),
+                     size=app.config['ENGINE_POOL_SIZE'])
+    for name in BOTS
+} if app.config['ENGINE_POOL_SIZE'] > 0 else {}
+SESSIONS = SessionStore(max_sessions=app.config['MAX_SESSIONS'],
+                        idle_timeout=app.config['SESSION_IDLE_TIMEOUT'])
+JOBS = EngineJobQueue(workers=app.config['ENGINE_JOB_WORKERS'],
+                      max_pending=app.config['ENGINE_QUEUE_SIZE'])
+# Las búsquedas de ponder van aparte: si no caben, simplemente no se hacen.
+# La cola limita las de este proceso y las plazas, las de toda la máquina
+PONDERS = EngineJobQueue(workers=app.config['PONDER_JOBS'],
+                         max_pending=app.config['PONDER_JOBS'])
+PONDER_SLOTS = HostSlots(app.config['PONDER_LOCK_PATH'], app.config['PONDER_JOBS'])
+
+METRICS = Registry()
+MOVE_SECONDS = METRICS.histogram('chess_bot_move_seconds', 'Tiempo de cálculo de la jugada del bot', ('bot', 'mode'))
+SEARCH_DEPTH = METRICS.histogram('chess_bot_search_depth', 'Profundidad alcanzada por búsqueda', ('bot',),
+                                 buckets=(1, 2, 3, 4, 5, 6, 7, 8, 10, 12))
+SEARCH_COUNTERS = {
+    field: METRICS.counter(f'chess_bot_search_{field}_total', documentation, ('bot',))
+    for field, documentation in (
+        ('nodes', 'Nodos visitados'),
+        ('qnodes', 'Nodos de quiescencia visitados'),
+        ('tt_probes', 'Consultas a la tabla de transposición'),
+        ('tt_hits', 'Aciertos en la tabla de transposición'),
+        ('cutoffs', 'Cortes beta'),
+        ('tb_hits', 'Aciertos en las tablas de finales'),
+    )
+}
+BOOK_MOVES = METRICS.counter('chess_bot_book_moves_total', 'Jugadas sacadas del libro de aperturas', ('bot',))
+TABLEBASE_MOVES = METRICS.counter('chess_bot_tablebase_moves_total', 'Jugadas sacadas de las tablas de finales', ('bot',))
+CACHED_MOVES = METRICS.counter('chess_bot_cached_moves_total', 'Jugadas sacadas de la caché de posiciones', ('bot',))
+ANALYSED_POSITIONS = METRICS.counter('chess_analysis_positions_total', 'Posiciones analizadas por lotes', ('bot',))
+PONDER_RESULTS = METRICS.counter('chess_ponder_total', 'Jugadas del jugador con ponder: acierto o fallo', ('result',))
+METRICS.gauge('chess_engine_jobs_pending', 'Búsquedas en cola o en curso', JOBS.pending)
+METRICS.gauge('chess_sessions_active', 'Partidas en memoria', lambda: len(SESSIONS))
+
+def record_search(bot, stats):
+    """Hook de estadísticas de los bots: acumula los contadores por bot."""
+    name = bot.name.lower()
+    if stats.book:
+        BOOK_MOVES.inc(bot=name)
+        return
+    if stats.tablebase:
+        TABLEBASE_MOVES.inc(bot=name)
+        return
+    if stats.cached:
+        CACHED_MOVES.inc(bot=name)
+        return
+    SEARCH_DEPTH.observe(stats.depth, bot=name)
+    for field, counter in SEARCH_COUNTERS.items():
+        counter.inc(getattr(stats, field), bot=name)
+
+for bot in BOTS.values():
+    bot.set_node_counters(app.config['ENGINE_NODE_COUNTERS'])
+    bot.add_stats_hook(record_search)
 
 @app.route('/')
 def index():
@@ -19,32 +93,275 @@ def game(bot_name, mode):
         return "Invalid parameters", 400
     return render_template('game.html', 
                          bot=BOTS[bot_name], 
+                         bot_id=bot_name, 
                          mode=mode, 
                          modes=GAME_MODES)
 
+@app.route('/game/new', methods=['POST'])
+def new_game():
+    data = request.json
+    bot_name = data.get('bot')
+    mode = data.get('mode')
+    if bot_name not in BOTS or mode not in GAME_MODES:
+        return jsonify({'error': 'Invalid parameters'}), 400
+
+    settings = GAME_MODES[mode]
+    session = SESSIONS.create(bot_name, BOTS[bot_name].new_game(), mode,
+                              settings['time'] * 60, settings.get('increment', 0))
+    return jsonify({
+        'game_id': session.game_id,
+        'fen': session.board.fen(),
+        'clock': session.clock_state()
+    })
+
 @app.route('/move', methods=['POST'])
 def make_move():
     data = request.json
-    print("Received data:", data)  # Debug log
-    
-    board = chess.Board(data['fen'])
-    bot_name = data['bot']
-    print(f"Bot name: {bot_name}")  # Debug log
-    
+    session = SESSIONS.get(data.get('game_id'))
+    if session is None:
+        return jsonify({'error': 'Unknown game'}), 404
+    with session.lock:
+        board = session.board
+        if board.turn != chess.WHITE or (session.job is not None and not session.job.finished):
+            return jsonify({'error': 'Bot is still thinking'}), 409
+        try:
+            player_move = chess.Move.from_uci(data['move'])
+        except (KeyError, ValueError):
+            return jsonify({'error': 'Invalid move'}), 400
+        if player_move not in board.legal_moves:
+            return jsonify({'error': 'Illegal move'}), 400
+
+        # Si el bot pensaba en otra jugada, su búsqueda sobra (la tabla se conserva)
+        ponder = None
+        if session.ponder is not None:
+            predicted, ponder = session.ponder
+            if predicted != player_move:
+                PONDERS.cancel(ponder.id)
+                ponder = None
+            PONDER_RESULTS.inc(result='hit' if ponder is not None else 'miss')
+
+        # Rechazar antes de jugar si la cola de búsquedas está llena
+        try:
+            session.job = JOBS.submit(bot_move_task(session, ponder), game_id=session.game_id)
+        except JobQueueFull:
+            if ponder is not None:
+                PONDERS.cancel(ponder.id)
+            session.ponder = None
+            return jsonify({'error': 'Engine busy'}), 503, {'Retry-After': '1'}
+        session.ponder = None
+        session.push(player_move)
+
+    return jsonify({'job_id': session.job.id}), 202
+
+def bot_move_task(session, ponder=None):
+    """
+    Búsqueda del bot para ``session``, ejecutada en el pool de trabajos. Con
+    ``ponder`` (el jugador hizo la jugada prevista) se espera a esa búsqueda,
+    que ya lleva ventaja, en lugar de empezar otra. Si se cancela o falla, la
+    jugada del jugador se deshace (``take_back``).
+    """
+    def play(job):
+        board = session.board
+        if board.is_game_over():
+            return {'move': None, 'fen': board.fen(), 'clock': session.clock_state()}
+
+        start_time = time.time()
+        limit = session.limit()
+        bot_move = None
+        if ponder is not None:
+            while not ponder.join(timeout=0.1):
+                if job.cancelled:
+                    PONDERS.cancel(ponder.id)
+                    return None
+            if ponder.status == DONE and ponder.result is not None:
+                bot_move = chess.Move.from_uci(ponder.result['move'])
+                for info in ponder.events:
+                    job.publish(info)
+
+        # Obtener el movimiento del bot sobre el tablero de la partida,
+        # con el tiempo que le queda en el reloj
+        pool = ENGINE_POOLS.get(session.bot_name)
+        if bot_move is None and pool is not None:
+            bot_move, stats = pool.play(board, limit, stop_event=job.stop_event, on_info=job.publish)
+            session.bot.report_stats(stats)
+        elif bot_move is None:
+            with session.engine_lock:
+                bot_move = session.bot.get_move(board, limit=limit, stop_event=job.stop_event, on_info=job.publish)
+        if job.cancelled:
+            return None
+
+        elapsed = time.time() - start_time
+        MOVE_SECONDS.observe(elapsed, bot=session.bot_name, mode=session.mode)
+
+        # El "pensamiento" simulado lo aplica el cliente, no el servidor
+        delay_ms = session.bot.display_delay(board, elapsed, limit)
+
+        # Hacer el movimiento en el tablero
+        session.push(bot_move, delay=delay_ms / 1000)
+        # Con el pool la tabla de la partida está en otro proceso: sin ponder
+        if app.config['PONDER'] and pool is None:
+            start_pondering(session)
+
+        return {
+            'move': bot_move.uci(),
+            'fen': board.fen(),
+            'clock': session.clock_state(),
+            'display_delay_ms': delay_ms,
+            'ponder_hit': ponder is not None,
+        }
+
+    def task(job):
+        with session.lock:
+            try:
+                result = play(job)
+            except Exception:
+                take_back(session, job)
+                raise
+            if result is None:
+                take_back(session, job)
+            return result
+    return task
+
+def take_back(session, job):
+    """
+    Deshace la jugada del jugador que esperaba a ``job`` si la búsqueda se
+    canceló o falló, para que pueda volver a mover. Se llama con
+    ``session.lock`` tomado; una segunda llamada no hace nada.
+    """
+    if session.job is job and session.board.turn == chess.BLACK:
+        session.pop()
+        session.job = None
+
+def start_pondering(session):
+    """
+    Lanza la búsqueda de la respuesta a la jugada que el bot espera del
+    jugador. Se llama con ``session.lock`` tomado, tras la jugada del bot.
+    """
+    board = session.board
+    if board.is_game_over():
+        return
+    predicted = session.bot.ponder_move(board)
+    if predicted is None:
+        return
+    board = board.copy()
+    board.push(predicted)
+    if board.is_game_over():
+        return
+    # El reloj del bot está parado: su presupuesto es el de la jugada siguiente
+    limit = session.limit()
+
+    def task(job):
+        # Sin plaza libre en la máquina el ponder no se hace (sin resultado)
+        with session.engine_lock, PONDER_SLOTS.slot() as acquired:
+            if job.cancelled or not acquired:
+                return None
+            move = session.bot.get_move(board, limit=limit, stop_event=job.stop_event, on_info=job.publish)
+        return None if job.cancelled else {'move': move.uci()}
+
+    try:
+        session.ponder = (predicted, PONDERS.submit(task, game_id=session.game_id))
+    except JobQueueFull:
+        session.ponder = None
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events: un evento ``info`` por iteración y uno final con el resultado."""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+
+    def stream():
+        sent = 0
+        while True:
+            finished = job.finished
+            events = job.wait(sent, timeout=15)
+            for info in events:
+                yield f"event: info\ndata: {json.dumps(info)}\n\n"
+            sent += len(events)
+            if finished:
+                yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = JOBS.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    # Cancelado antes de empezar: la búsqueda no llegará a deshacer la jugada
+    session = SESSIONS.get(job.game_id)
+    if session is not None and job.status == CANCELLED:
+        with session.lock:
+            take_back(session, job)
+    return jsonify(job.to_dict())
+
+@app.route('/game/<game_id>/state')
+def game_state(game_id):
+    session = SESSIONS.get(game_id)
+    if session is None:
+        return jsonify({'error': 'Unknown game'}), 404
+    with session.lock:
+        return jsonify({'fen': session.board.fen(), 'clock': session.clock_state()})
+
+@app.route('/game/<game_id>/resign', methods=['POST'])
+def resign(game_id):
+    # Cancelar cualquier búsqueda en curso y liberar la partida
+    JOBS.cancel_game(game_id)
+    PONDERS.cancel_game(game_id)
+    SESSIONS.remove(game_id)
+    return jsonify({'status': 'resigned'})
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analiza una lista de FEN (``fens``) o las posiciones de una partida
+    (``pgn``) y devuelve una línea JSON (NDJSON) por posición, en orden, con
+    la mejor jugada, el valor y la profundidad. ``depth`` y ``movetime``
+    (segundos por posición) son opcionales.
+    """
+    data = request.get_json(silent=True) or {}
+    bot_name = data.get('bot')
+    if bot_name not in BOTS:
+        return jsonify({'error': 'Invalid bot'}), 400
+    try:
+        if 'pgn' in data:
+            boards = boards_from_pgn(data['pgn'])
+        else:
+            boards = boards_from_fens(data.get('fens') or [])
+        depth = int(data['depth']) if data.get('depth') else None
+        movetime = float(data.get('movetime') or app.config['ANALYSIS_MOVE_TIME'])
+    except (AnalysisError, TypeError, ValueError) as error:
+        return jsonify({'error': str(error)}), 400
+    if not boards:
+        return jsonify({'error': 'No positions'}), 400
+    if len(boards) > app.config['ANALYSIS_MAX_POSITIONS']:
+        return jsonify({'error': 'Too many positions'}), 413
+
     bot = BOTS[bot_name]
-    print(f"Using bot: {bot.name}")  # Debug log
-    
-    # Obtener el movimiento del bot
-    bot_move = bot.get_move(board)
-    print(f"Bot move: {bot_move}")  # Debug log
-    
-    # Hacer el movimiento en el tablero
-    board.push(bot_move)
-    
-    return jsonify({
-        'move': bot_move.uci(),
-        'fen': board.fen()
-    })
+    limit = chess.engine.Limit(time=movetime, depth=depth)
+    workers = min(app.config['ANALYSIS_WORKERS'], len(boards))
+
+    def stream():
+        for result in bot.analyse_batch(boards, limit, workers):
+            ANALYSED_POSITIONS.inc(bot=bot_name)
+            yield json.dumps(result) + '\n'
+
+    return Response(stream(), mimetype='application/x-ndjson')
+
+@app.route('/metrics')
+def metrics():
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -2,9 +2,16 @@ from .alan import AlanBot
 from .elena import ElenaBot
 from .ricardo import RicardoBot
 
-def load_bots():
+# Clases de los bots por nombre (motor UCI, bench, torneos)
+BOTS = {
+    'alan': AlanBot,
+    'elena': ElenaBot,
+    'ricardo': RicardoBot,
+}
+
+def load_bots(workers=1, tablebase=None, position_cache=None):
     return {
         'alan': AlanBot(),
         'elena': ElenaBot(),
-        'ricardo': RicardoBot()
+        'ricardo': RicardoBot(workers=workers, tablebase=tablebase, position_cache=position_cache)
     }
\ No newline at end of file
@@ -1,27 +1,27 @@
 from .base_bot import BaseBot
+from .stats import SearchStats
 import chess
 import random
-import time
 
 class AlanBot(BaseBot):
     def __init__(self):
         super().__init__("Alan", 500)
     
-    def get_move(self, board):
-        # Simular "pensamiento"
-        time.sleep(self.think_time())
+    def think_time(self, board=None):
+        # Alan duda un poco más cuando tiene alguna captura disponible
+        seconds = super().think_time(board)
+        if board is not None and any(board.is_capture(move) for move in board.legal_moves):
+            seconds += random.uniform(0.5, 1.5)
+        return seconds
+    
+    def get_move(self, board, limit=None, stop_event=None, on_info=None):
         # Bot básico que hace movimientos aleatorios legales
+        stats = SearchStats()
         legal_moves = list(board.legal_moves)
         if not legal_moves:
             return None  # No hay movimientos legales disponibles
-        
-        if any(board.is_capture(move) for move in legal_moves):
-            time.sleep(random.uniform(0.5, 1.5))
-            
-        # Debug: imprimir movimientos disponibles
-        print(f"Legal moves for Alan: {[move.uci() for move in legal_moves]}")
-        
+
         selected_move = random.choice(legal_moves)
-        print(f"Alan selected move: {selected_move.uci()}")
-        
+        # Sin búsqueda: solo se registra el tiempo
+        self.report_stats(stats)
         return selected_move
\ No newline at end of file
@@ -0,0 +1,71 @@
+# bots/analysis.py
+"""
+Análisis por lotes: muchas posiciones repartidas entre procesos.
+
+Cada proceso del pool crea su propio bot una sola vez (``BaseBot.worker_args``)
+y lo reutiliza para todas las posiciones que le tocan, así la tabla de
+transposición y las tablas de finales se aprovechan de una posición a la
+siguiente. Los resultados salen en el orden de entrada en cuanto están listos.
+"""
+import io
+
+import chess
+import chess.pgn
+
+from .process_pool import shared_pool, worker_state
+
+
+class AnalysisError(ValueError):
+    """Posición o partida que no se puede analizar."""
+
+
+def boards_from_fens(fens):
+    boards = []
+    for index, fen in enumerate(fens):
+        try:
+            board = chess.Board(fen)
+        except (TypeError, ValueError) as error:
+            raise AnalysisError(f"Invalid FEN at index {index}: {error}") from None
+        if not board.is_valid():
+            raise AnalysisError(f"Invalid position at index {index}")
+        boards.append(board)
+    return boards
+
+
+def boards_from_pgn(pgn):
+    """Posiciones antes de cada jugada de la línea principal y la final."""
+    game = chess.pgn.read_game(io.StringIO(pgn))
+    if game is None or game.errors:
+        raise AnalysisError("Invalid PGN")
+    board = game.board()
+    boards = [board.copy()]
+    for move in game.mainline_moves():
+        board.push(move)
+        boards.append(board.copy())
+    return boards
+
+
+def analyse_batch(bot, boards, limit=None, workers=1):
+    """
+    Genera ``bot.analyse`` de cada tablero, en orden. Con ``workers`` > 1 los
+    tableros se reparten entre procesos; solo viaja el FEN, así que en ese
+    caso el bot no ve el historial (repeticiones).
+    """
+    if workers <= 1:
+        bot = bot.new_game()
+        for board in boards:
+            yield bot.analyse(board, limit)
+        return
+    # Un pool por clase de bot y número de procesos
+    executor = shared_pool(workers, _worker_bot, type(bot), bot.worker_args(), bot.node_counters, key=type(bot))
+    yield from executor.map(_analyse_fen, [board.fen() for board in boards], [limit] * len(boards))
+
+
+def _worker_bot(bot_class, kwargs, node_counters):
+    bot = bot_class(**kwargs)
+    bot.set_node_counters(node_counters)
+    return bot
+
+
+def _analyse_fen(fen, limit):
+    return worker_state().analyse(chess.Board(fen), limit)
@@ -1,15 +1,28 @@
 # bots/base_bot.py
 import chess
+import copy
 import random
 import time
 from abc import ABC, abstractmethod
+from . import analysis
+from .stats import SearchStats
+from .time_manager import clock
+
+# La pausa simulada nunca pasa de esta fracción del reloj que le queda al bot
+PACING_CLOCK_FRACTION = 1 / 40
 
 class BaseBot(ABC):
+    # Contadores por nodo (nodos de quiescencia, consultas a la tabla...).
+    # Desactivados, la búsqueda usa las versiones sin contar y no cuestan nada.
+    node_counters = True
+
     def __init__(self, name, elo):
         self.name = name
         self.elo = elo
+        self.last_stats = None
+        self.stats_hooks = []
     
-    def think_time(self):
+    def think_time(self, board=None):
         """
         Calcula el tiempo de pensamiento basado en el ELO.
         Bots más fuertes "piensan" más consistentemente.
@@ -23,6 +36,83 @@ class BaseBot(ABC):
         else:  # Bot avanzado (Ricardo)
             return random.uniform(2.0, 4.0)
     
+    def display_delay(self, board, elapsed=0.0, limit=None):
+        """
+        Milisegundos que el cliente espera antes de mostrar la jugada para
+        simular que el bot piensa. Se descuenta el tiempo real de cálculo, así
+        el servidor nunca duerme dentro de una petición. Con reloj, la pausa
+        se acorta para ir al ritmo de la partida (p. ej. en bullet).
+        """
+        seconds = self.think_time(board)
+        remaining, increment = clock(board, limit)
+        if remaining is not None:
+            seconds = min(seconds, remaining * PACING_CLOCK_FRACTION + increment)
+        return max(0, int((seconds - elapsed) * 1000))
+    
+    def new_game(self):
+        """
+        Devuelve la instancia del bot para una partida nueva. Los bots con
+        estado de búsqueda (tablas, historial) deben darle uno propio.
+        """
+        return copy.copy(self)
+    
+    def ponder_move(self, board):
+        """
+        Respuesta que el bot espera del rival en ``board`` (tras su propia
+        jugada), para pensar en su tiempo. None si el bot no hace ponder.
+        """
+        return None
+
+    def worker_args(self):
+        """
+        Argumentos (serializables) para crear un bot equivalente en otro
+        proceso con ``type(self)(**worker_args())``.
+        """
+        return {}
+
+    def analyse(self, board, limit=None):
+        """
+        Analiza ``board`` sin pausa simulada: dict con el FEN, la mejor
+        jugada (o None si la partida ha terminado) y las estadísticas de la
+        búsqueda (valor, profundidad, nodos...).
+        """
+        if board.is_game_over():
+            return {'fen': board.fen(), 'move': None, **SearchStats().to_dict()}
+        move = self.get_move(board, limit)
+        return {'fen': board.fen(), 'move': move.uci(), **self.last_stats.to_dict()}
+
+    def analyse_batch(self, boards, limit=None, workers=1):
+        """
+        Generador con ``analyse`` de cada tablero, en orden. Con ``workers`` > 1
+        las posiciones se reparten entre procesos (ver ``bots.analysis``).
+        """
+        return analysis.analyse_batch(self, boards, limit, workers)
+
+    def add_stats_hook(self, hook):
+        """
+        Registra ``hook(bot, stats)``, que recibe el ``SearchStats`` de cada
+        búsqueda. Las partidas nuevas (``new_game``) comparten los hooks.
+        """
+        self.stats_hooks.append(hook)
+
+    def set_node_counters(self, enabled):
+        self.node_counters = enabled
+
+    def report_stats(self, stats):
+        """Cierra las estadísticas de la búsqueda y avisa a los hooks."""
+        stats.finish()
+        self.last_stats = stats
+        for hook in self.stats_hooks:
+            hook(self, stats)
+        return stats
+
     @abstractmethod
-    def get_move(self, board):
+    def get_move(self, board, limit=None, stop_event=None, on_info=None):
+        """
+        Devuelve la jugada del bot. ``limit`` (``chess.engine.Limit``) trae el
+        reloj de la partida para repartir el tiempo, ``stop_event``
+        (threading.Event) cancela la búsqueda de forma cooperativa y
+        ``on_info`` recibe un dict con el progreso (profundidad, valor,
+        variante principal...).
+        """
         pass
\ No newline at end of file
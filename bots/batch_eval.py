@@ -0,0 +1,110 @@
+# bots/batch_eval.py
+"""
+Evaluación por lotes con NumPy.
+
+Un lote guarda los bitboards de cada posición (6 tipos de pieza y 2 colores,
+enteros de 64 bits) y calcula de una vez para todas las posiciones los
+términos que solo dependen de ellos: material, tablas pieza-casilla
+(centralidad y avance de peones incluidos), peones doblados, columnas
+abiertas y piezas desarrolladas. Los términos que necesitan generar jugadas
+o ataques (movilidad, control del centro, seguridad del rey) siguen siendo
+por posición, en los bots.
+
+NumPy es opcional: sin él ``available()`` es falso y los bots evalúan
+posición a posición con el mismo resultado. Se importa con la primera
+tabla (``table_array``), no al cargar los bots: ocupa unos 13 MB en cada
+proceso del pool que no lo use.
+"""
+import importlib.util
+
+import chess
+
+np = None
+FILE_MASKS = RANK_MASKS = None
+
+
+def available():
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _load_numpy():
+    global np, FILE_MASKS, RANK_MASKS
+    if np is None:
+        import numpy
+        FILE_MASKS = numpy.array(chess.BB_FILES, dtype=numpy.uint64)
+        RANK_MASKS = numpy.array(chess.BB_RANKS, dtype=numpy.uint64)
+        np = numpy
+
+
+def table_array(table):
+    """Tabla pieza-casilla (12 x 64) como vector de NumPy, o None sin NumPy."""
+    if not available():
+        return None
+    _load_numpy()
+    return np.array(table, dtype=np.int64)
+
+
+def uint64(bitboard):
+    return np.uint64(bitboard)
+
+
+def popcount(values):
+    """Número de bits a 1 de cada entero de 64 bits de ``values``."""
+    octets = values.astype('<u8').view(np.uint8).reshape(values.shape + (8,))
+    return np.unpackbits(octets, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+class BoardBatch:
+    """
+    Bitboards de un lote de posiciones. Se puede llenar de una vez
+    (``BoardBatch(boards)``) o con ``add`` mientras se recorre un árbol, ya
+    que solo copia enteros del tablero.
+    """
+
+    def __init__(self, boards=()):
+        self.rows = []
+        for board in boards:
+            self.add(board)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, board):
+        self.rows.append((board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+                          board.occupied_co[chess.BLACK], board.occupied_co[chess.WHITE],
+                          board.turn, len(board.move_stack)))
+
+    def arrays(self):
+        """(piezas por tipo (n, 6), colores (n, 2), turno (n,), jugadas jugadas (n,))."""
+        _load_numpy()
+        rows = np.array([row[:8] for row in self.rows], dtype=np.uint64).reshape(-1, 8)
+        turn = np.array([row[8] for row in self.rows], dtype=bool)
+        plies = np.array([row[9] for row in self.rows], dtype=np.int64)
+        return rows[:, :6], rows[:, 6:], turn, plies
+
+
+def planes(pieces, colors):
+    """Bitboards (n, 12) en el orden de piezas de Polyglot (``piece_index``)."""
+    return (pieces[:, :, None] & colors[:, None, :]).reshape(-1, 12)
+
+
+def psqt_scores(pieces, colors, table):
+    """Suma de la tabla pieza-casilla de cada posición (positiva para las blancas)."""
+    count = len(pieces)
+    octets = planes(pieces, colors).astype('<u8').view(np.uint8).reshape(count, 12, 8)
+    # Bit i de cada bitboard = casilla i
+    squares = np.unpackbits(octets, axis=-1, bitorder='little').reshape(count, 12 * 64)
+    return squares.astype(np.int64) @ table
+
+
+def doubled_pawns(pawns):
+    """Como ``evaluation.doubled_pawns`` para un vector de bitboards de peones."""
+    counts = popcount(pawns[:, None] & FILE_MASKS[None, :])
+    return np.maximum(counts - 1, 0).sum(axis=1)
+
+
+def open_file_masks(occupied):
+    """Como ``evaluation.open_files`` para un vector de ocupaciones."""
+    empty = (occupied[:, None] & RANK_MASKS[None, :]) == 0
+    return np.bitwise_or.reduce(np.where(empty, FILE_MASKS[None, :], np.uint64(0)), axis=1)
+
@@ -0,0 +1,440 @@
+# bots/bench.py
+"""
+Banco de pruebas de los motores.
+
+Ejecuta cada bot sobre un conjunto fijo de posiciones (apertura, medio juego,
+tácticas y finales) y un perft de generación de jugadas, y guarda en JSON
+nodos por segundo, tiempo hasta cada profundidad, tasa de aciertos de la
+tabla de transposición, factor de ramificación efectivo, memoria máxima y la
+memoria de un proceso de búsqueda de Ricardo (el presupuesto por worker)::
+
+    python -m bots.bench -o base.json
+    python -m bots.bench -o new.json
+    python -m bots.bench --compare base.json new.json
+    python -m bots.bench --bots ricardo --disable null_move -o sin-nulo.json
+
+La comparación termina con código 1 si alguna métrica empeora más del umbral,
+si un perft (con o sin la caché de jugadas) no da los nodos esperados o si la
+evaluación por lotes (NumPy) no coincide con la de posición a posición.
+
+Los libros de aperturas se desactivan y las búsquedas no incluyen la pausa de
+``think_time`` (solo la aplica el cliente), así que los tiempos son de cálculo.
+Ricardo busca a profundidad fija sin límite de tiempo para que el número de
+nodos sea reproducible entre ejecuciones.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from . import BOTS, batch_eval
+from .ricardo import RicardoBot, SEARCH_FEATURES
+from .move_cache import MoveCache
+from .opening_book import OpeningBook
+from .search_board import SearchBoard
+from .tablebase import open_tablebase
+
+# (nombre, categoría, FEN)
+POSITIONS = [
+    ('ruy-lopez', 'opening', 'r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3'),
+    ('queens-gambit', 'opening', 'rnbqkb1r/ppp2ppp/4pn2/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4'),
+    ('kiwipete', 'middlegame', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'),
+    ('isolani', 'middlegame', 'r1bq1rk1/pp2bppp/2n1pn2/3p4/3P4/2NB1N2/PP3PPP/R1BQ1RK1 w - - 4 10'),
+    ('wac-001', 'tactical', '2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - - 0 1'),
+    ('wac-002', 'tactical', '8/7p/5k2/5p2/p1p2P2/Pr1pPK2/1P1R3P/8 b - - 0 1'),
+    ('rook-endgame', 'endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'),
+    ('king-pawn', 'endgame', '8/8/8/4k3/8/8/4P3/4K3 w - - 0 1'),
+]
+
+# (nombre, FEN, profundidad, {profundidad: nodos esperados})
+PERFT_POSITIONS = [
+    ('startpos', chess.STARTING_FEN, 4, {3: 8902, 4: 197281}),
+    ('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1', 3, {2: 2039, 3: 97862}),
+    ('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', 4, {3: 2812, 4: 43238}),
+    ('promotions', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', 3, {2: 264, 3: 9467}),
+    ('checks', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', 3, {2: 1486, 3: 62379}),
+]
+
+# Métricas comparadas: (clave, mayor es mejor)
+COMPARED_METRICS = [
+    ('nps', True),
+    ('time', False),
+    ('nodes', False),
+]
+# Por debajo de este tiempo (segundos) la variación es ruido
+MIN_TIME = 0.1
+
+
+def perft(board, depth):
+    """Cuenta las hojas a ``depth`` plies; el último ply solo cuenta jugadas."""
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.generate_legal_moves():
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def cached_perft(board, depth, cache):
+    """``perft`` con las jugadas de la caché, que se reutilizan en cada transposición."""
+    moves = cache.legal_moves(board)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.push(move)
+        nodes += cached_perft(board, depth - 1, cache)
+        board.pop()
+    return nodes
+
+
+def run_perft(shallower=0):
+    """
+    Perft con la generación de python-chess y con la caché de jugadas de los
+    bots (``MoveCache``); los dos deben dar los nodos esperados.
+    """
+    results = []
+    for name, fen, depth, expected in PERFT_POSITIONS:
+        depth -= shallower
+        board = SearchBoard(fen)
+        start = time.perf_counter()
+        nodes = perft(board, depth)
+        elapsed = time.perf_counter() - start
+        cache = MoveCache()
+        start = time.perf_counter()
+        cached_nodes = cached_perft(board, depth, cache)
+        cached_elapsed = time.perf_counter() - start
+        results.append({
+            'name': name,
+            'depth': depth,
+            'nodes': nodes,
+            'cached_nodes': cached_nodes,
+            'expected': expected[depth],
+            'ok': nodes == cached_nodes == expected[depth],
+            'time': round(elapsed, 3),
+            'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+            'cached_nps': int(cached_nodes / cached_elapsed) if cached_elapsed > 0 else 0,
+            'cache_hit_rate': round(cache.hits / (cache.hits + cache.misses), 3),
+        })
+    return results
+
+
+def run_batch_evaluation(bot_names):
+    """
+    Compara ``evaluate_batch`` con ``evaluate_position`` en las posiciones
+    del banco y en todas sus hijas: deben coincidir exactamente.
+    """
+    boards = []
+    for _, _, fen in POSITIONS:
+        board = chess.Board(fen)
+        boards.append(board)
+        for move in board.legal_moves:
+            child = board.copy()
+            child.push(move)
+            boards.append(child)
+    results = []
+    for name in bot_names:
+        bot = BOTS[name]()
+        if not hasattr(bot, 'evaluate_batch'):
+            continue
+        # La primera llamada importa NumPy: no se cuenta en el tiempo
+        bot.evaluate_batch(boards[:1])
+        start = time.perf_counter()
+        scalar = [bot.evaluate_position(board) for board in boards]
+        scalar_time = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = bot.evaluate_batch(boards)
+        batch_time = time.perf_counter() - start
+        results.append({
+            'name': name,
+            'positions': len(boards),
+            'ok': scalar == batch,
+            'numpy': batch_eval.available(),
+            'scalar_time': round(scalar_time, 3),
+            'batch_time': round(batch_time, 3),
+        })
+    return results
+
+
+def worker_memory(depth):
+    """
+    Memoria de un proceso de búsqueda de Ricardo recién creado (como los del
+    pool), tras buscar la posición más cara del banco: RSS máximo y bytes de
+    la tabla de transposición.
+    """
+    # Sin new_game: los procesos del pool usan la tabla de tamaño completo
+    bot = RicardoBot()
+    bot.opening_book = OpeningBook()
+    bot.max_depth = depth
+    bot.time_budget = float('inf')
+    search_position(bot, POSITIONS[2][2])
+    return {
+        'rss_kb': peak_rss_kb(),
+        'tt_kb': bot.transposition_table.memory() // 1024,
+        'hash_size': bot.transposition_table.size,
+    }
+
+
+def peak_rss_kb():
+    """
+    Pico de memoria residente del proceso. En Linux se lee VmHWM: ru_maxrss
+    conserva tras el exec el pico del proceso padre del que se bifurcó.
+    """
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker_memory(depth):
+    # Proceso nuevo con spawn: con fork heredaría la memoria del banco
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(worker_memory, depth).result()
+
+
+def configure(bot, depth):
+    """Prepara una instancia limpia del bot para medir solo la búsqueda."""
+    bot = bot.new_game()
+    bot.opening_book = OpeningBook()
+    if isinstance(bot, RicardoBot):
+        bot.max_depth = depth
+        bot.time_budget = float('inf')
+    return bot
+
+
+def branching_factor(iterations, total_nodes, depth):
+    """
+    Factor de ramificación efectivo: media geométrica del crecimiento de
+    nodos entre iteraciones o, con una sola iteración, la raíz ``depth`` de
+    los nodos totales.
+    """
+    nodes = [count for _, count in iterations if count > 0]
+    if len(nodes) >= 2:
+        return round((nodes[-1] / nodes[0]) ** (1 / (len(nodes) - 1)), 2)
+    if total_nodes and depth:
+        return round(total_nodes ** (1 / depth), 2)
+    return None
+
+
+def search_position(bot, fen):
+    board = chess.Board(fen)
+    events = []
+    start = time.perf_counter()
+    move = bot.get_move(board, on_info=lambda info: events.append((info, time.perf_counter() - start)))
+    elapsed = time.perf_counter() - start
+
+    nodes = getattr(bot, 'nodes_evaluated', 0)
+    time_to_depth = {}
+    iterations = []
+    previous = 0
+    for info, at in events:
+        time_to_depth[info['depth']] = round(at, 3)
+        # Los nodos que informa Ricardo son acumulados
+        count = info.get('nodes', 0)
+        iterations.append((info['depth'], count - previous))
+        previous = count
+    depth = max(time_to_depth) if time_to_depth else 0
+
+    result = {
+        'move': move.uci() if move else None,
+        'depth': depth,
+        'nodes': nodes,
+        'time': round(elapsed, 3),
+        'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+        'time_to_depth': time_to_depth,
+        'branching_factor': branching_factor(iterations, nodes, depth),
+    }
+    if bot.last_stats is not None:
+        result['qnodes'] = bot.last_stats.qnodes
+        result['cutoffs'] = bot.last_stats.cutoffs
+    table = getattr(bot, 'transposition_table', None)
+    if table is not None:
+        result['tt_probes'] = table.probes
+        result['tt_hits'] = table.hits
+        result['tt_hit_rate'] = round(table.hits / table.probes, 3) if table.probes else 0.0
+    return result
+
+
+def totals(results):
+    nodes = sum(result['nodes'] for result in results)
+    elapsed = sum(result['time'] for result in results)
+    return {'nodes': nodes, 'time': round(elapsed, 3), 'nps': int(nodes / elapsed) if elapsed > 0 else 0}
+
+
+def create_bot(name, tablebase=None, disabled=()):
+    if name == 'ricardo':
+        bot = RicardoBot(tablebase=tablebase)
+        # Técnicas de búsqueda selectiva apagadas para medir cuánto aportan
+        for feature in disabled:
+            setattr(bot, feature, False)
+        return bot
+    return BOTS[name]()
+
+
+def run_bot(name, depth, positions, measure_memory=False, tablebase=None, disabled=()):
+    bot = create_bot(name, tablebase, disabled)
+    results = []
+    for position_name, category, fen in positions:
+        result = search_position(configure(bot, depth), fen)
+        result.update(name=position_name, category=category)
+        results.append(result)
+
+    summary = totals(results)
+    probes = sum(result.get('tt_probes', 0) for result in results)
+    if probes:
+        summary['tt_hit_rate'] = round(sum(result['tt_hits'] for result in results) / probes, 3)
+    factors = [result['branching_factor'] for result in results if result['branching_factor']]
+    if factors:
+        summary['branching_factor'] = round(sum(factors) / len(factors), 2)
+
+    if measure_memory:
+        # Segunda pasada con tracemalloc: ralentiza la búsqueda, así que no
+        # se mezcla con las medidas de tiempo
+        tracemalloc.start()
+        bot = create_bot(name, tablebase, disabled)
+        for _, _, fen in positions:
+            search_position(configure(bot, depth), fen)
+        summary['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return {'positions': results, 'totals': summary}
+
+
+def run(bot_names, depth, quick=False, measure_memory=False, skip_perft=False, tablebase=None, disabled=()):
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'python_chess': chess.__version__,
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'depth': depth,
+            'quick': quick,
+            'tablebase': tablebase.max_pieces if tablebase else 0,
+            'disabled': list(disabled),
+        },
+        'bots': {},
+    }
+    if not skip_perft:
+        report['perft'] = run_perft(shallower=1 if quick else 0)
+    report['batch_evaluation'] = run_batch_evaluation(bot_names)
+    positions = POSITIONS[::2] if quick else POSITIONS
+    for name in bot_names:
+        report['bots'][name] = run_bot(name, depth, positions, measure_memory, tablebase, disabled)
+    if 'ricardo' in bot_names:
+        report['worker_memory'] = run_worker_memory(depth)
+    # ru_maxrss está en KB en Linux
+    report['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return report
+
+
+def compare(base, new, threshold=0.1):
+    """Devuelve las líneas del informe y si hay regresiones."""
+    lines = []
+    regressions = False
+
+    def check(label, old_value, new_value, higher_is_better):
+        nonlocal regressions
+        if not old_value or new_value is None:
+            return
+        change = (new_value - old_value) / old_value
+        worse = -change if higher_is_better else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESIÓN'
+            regressions = True
+        lines.append(f"{label:<40} {old_value:>12} {new_value:>12} {change:>+8.1%}{flag}")
+
+    for name, results in new.get('bots', {}).items():
+        old = base.get('bots', {}).get(name)
+        if old is None:
+            continue
+        # Los totales solo se comparan sobre las posiciones de ambas ejecuciones
+        old_positions = {position['name']: position for position in old['positions']}
+        common = [(old_positions[position['name']], position)
+                  for position in results['positions'] if position['name'] in old_positions]
+        if not common:
+            continue
+        old_totals = totals([previous for previous, _ in common])
+        new_totals = totals([position for _, position in common])
+        for key, higher_is_better in COMPARED_METRICS:
+            check(f"{name}.{key}", old_totals[key], new_totals[key], higher_is_better)
+        for previous, position in common:
+            # Tiempo hasta la mayor profundidad que alcanzaron ambas ejecuciones
+            depths = set(previous['time_to_depth']) & set(position['time_to_depth'])
+            if depths:
+                depth = max(depths, key=int)
+                if max(previous['time_to_depth'][depth], position['time_to_depth'][depth]) < MIN_TIME:
+                    continue
+                check(f"{name}.{position['name']}.time_to_depth[{depth}]",
+                      previous['time_to_depth'][depth], position['time_to_depth'][depth], False)
+
+    for result in new.get('batch_evaluation', []):
+        if result['ok'] is False:
+            lines.append(f"batch_evaluation.{result['name']}: no coincide con evaluate_position")
+            regressions = True
+
+    if 'worker_memory' in base and 'worker_memory' in new:
+        check("worker_memory.rss_kb", base['worker_memory']['rss_kb'], new['worker_memory']['rss_kb'], False)
+
+    old_perft = {result['name']: result for result in base.get('perft', [])}
+    for result in new.get('perft', []):
+        if result.get('ok') is False:
+            lines.append(f"perft.{result['name']}: {result['nodes']} nodos ({result.get('cached_nodes')} con caché), "
+                         f"se esperaban {result['expected']}")
+            regressions = True
+        previous = old_perft.get(result['name'])
+        if previous is not None and previous['depth'] == result['depth']:
+            check(f"perft.{result['name']}.nps", previous['nps'], result['nps'], True)
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de los bots")
+    parser.add_argument('--bots', nargs='+', choices=sorted(BOTS), default=sorted(BOTS))
+    parser.add_argument('--depth', type=int, default=4, help="profundidad fija de Ricardo")
+    parser.add_argument('--quick', action='store_true', help="la mitad de posiciones y perft un ply menos")
+    parser.add_argument('--memory', action='store_true', help="mide la memoria máxima con tracemalloc")
+    parser.add_argument('--no-perft', action='store_true')
+    parser.add_argument('--syzygy', help="directorios de tablas Syzygy para Ricardo")
+    parser.add_argument('--disable', nargs='+', choices=SEARCH_FEATURES, default=[],
+                        help="técnicas de búsqueda selectiva que Ricardo no usa")
+    parser.add_argument('-o', '--output', help="fichero JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help="compara dos ejecuciones")
+    parser.add_argument('--threshold', type=float, default=0.1, help="empeoramiento tolerado (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            base = json.load(file)
+        with open(args.compare[1]) as file:
+            new = json.load(file)
+        lines, regressions = compare(base, new, args.threshold)
+        print(f"{'métrica':<40} {'base':>12} {'nuevo':>12} {'cambio':>8}")
+        print('\n'.join(lines))
+        return 1 if regressions else 0
+
+    report = run(args.bots, args.depth, quick=args.quick, measure_memory=args.memory, skip_perft=args.no_perft,
+                 tablebase=open_tablebase(args.syzygy), disabled=args.disable)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
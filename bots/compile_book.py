@@ -0,0 +1,29 @@
+# bots/compile_book.py
+"""
+Compila líneas JSON/PGN en un libro Polyglot ``.bin`` (ver ``opening_book``)::
+
+    python -m bots.compile_book static/openings.json -o static/openings.bin
+
+Va en un módulo aparte porque ``bots`` importa ``opening_book`` al cargarse:
+ejecutarlo con ``-m`` lo importaría dos veces.
+"""
+import argparse
+import os
+
+from .opening_book import STATIC_DIR, compile_sources
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila líneas JSON/PGN en un libro Polyglot .bin")
+    parser.add_argument('sources', nargs='+', help="ficheros .json (FEN -> jugadas) o .pgn")
+    parser.add_argument('-o', '--output', default=os.path.join(STATIC_DIR, 'openings.bin'))
+    parser.add_argument('--max-ply', type=int, default=20, help="jugadas por partida PGN")
+    args = parser.parse_args(argv)
+
+    book, boards = compile_sources(args.sources, max_ply=args.max_ply)
+    count = book.write_polyglot(args.output, boards)
+    print(f"{count} entradas de {len(book)} posiciones escritas en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
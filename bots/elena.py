@@ -1,4 +1,11 @@
 from .base_bot import BaseBot
+from .search_board import SearchBoard
+from .evaluation import elena_psqt, psqt_score, center_control
+from . import batch_eval
+from .move_cache import MoveCache
+from .opening_book import OpeningBook
+from .stats import SearchStats
+from .time_manager import SearchTimeout, allocate, depth_limit, node_limit
 import chess
 import random
 import time
@@ -14,196 +21,197 @@ class ElenaBot(BaseBot):
             chess.QUEEN: 900,
             chess.KING: 20000
         }
+        self.psqt = elena_psqt(self.piece_values)
+        self.psqt_array = None  # Para evaluate_batch, se crea al usarla
+        self.search_depth = 3
+        # Evalúa las hojas hermanas del último nivel en un solo lote (NumPy)
+        self.batch_leaves = False
+        self.time_budget = None  # Sin reloj siempre llega a search_depth
+        self.deadline = float('inf')
+        self.node_limit = float('inf')
+        self.stop_event = None
+        self.nodes_evaluated = 0
+        # Jugadas legales por posición: fin de partida, mate y generación comparten una
+        self.move_cache = MoveCache()
         
         # Sistema de aperturas mejorado con múltiples respuestas
         self.openings = {
             # Respuestas a 1.e4
-            "e2e4": {
-                # Siciliana
-                "mainline": ["c7c5"],
-                "responses": {
-                    "g1f3": ["d7d6", "e7e6", "b8c6"],  # Respuestas a Cf3
-                    "b1c3": ["b8c6", "e7e6"],          # Respuestas a Cc3
-                    "c2c3": ["b8c6", "d7d5"],          # Respuestas a c3
-                    "d2d4": ["c5d4"],                   # Captura obligada
+            "e2e4": [
+                {
+                    # Siciliana
+                    "mainline": ["c7c5"],
+                    "responses": {
+                        "g1f3": ["d7d6", "e7e6", "b8c6"],  # Respuestas a Cf3
+                        "b1c3": ["b8c6", "e7e6"],          # Respuestas a Cc3
+                        "c2c3": ["b8c6", "d7d5"],          # Respuestas a c3
+                        "d2d4": ["c5d4"],                   # Captura obligada
+                    },
+                    "anti_theory": {
+                        "f2f4": ["e7e6"],                  # Contra Grand Prix
+                        "b2b4": ["c5b4"],                  # Contra Wing Gambit
+                        "c2c4": ["b8c6"]                   # Contra c4
+                    },
+                    "follow_up": {
+                        "d2d4 c5d4": ["c3d4"],             # Recaptura con Cc3
+                        "g1f3 d7d6": ["f1b5"],             # Alfil a b5 (Siciliana Rossolimo)
+                        "b1c3 e7e6": ["f1c4"],             # Alfil a c4 (Siciliana Clásica)
+                    }
                 },
-                "anti_theory": {
-                    "f2f4": ["e7e6"],                  # Contra Grand Prix
-                    "b2b4": ["c5b4"],                  # Contra Wing Gambit
-                    "c2c4": ["b8c6"]                   # Contra c4
+                # Caro-Kann
+                {
+                    "mainline": ["c7c6"],
+                    "responses": {
+                        "d2d4": ["d7d5"],
+                        "b1c3": ["d7d5"],
+                        "d2d3": ["d7d5"]
+                    },
+                    "follow_up": {
+                        "e4e5": ["c8f5"],                  # Contra Advance
+                        "e4d5": ["c6d5"],                  # Captura obligada
+                        "b1d2": ["d7d5"],                  # Contra Two Knights
+                        "c1f4": ["g8f6"],                  # Desarrollo del caballo
+                    },
+                    "anti_theory": {
+                        "e4e6": ["d7d5"],                  # Contra Exchange Variation
+                        "b1d2": ["g8f6"],                  # Desarrollo del caballo
+                    }
                 },
-                "follow_up": {
-                    "d2d4 c5d4": ["c3d4"],             # Recaptura con Cc3
-                    "g1f3 d7d6": ["f1b5"],             # Alfil a b5 (Siciliana Rossolimo)
-                    "b1c3 e7e6": ["f1c4"],             # Alfil a c4 (Siciliana Clásica)
-                }
-            },
-            # Caro-Kann
-            "alternative1": {
-                "mainline": ["c7c6"],
-                "responses": {
-                    "d2d4": ["d7d5"],
-                    "b1c3": ["d7d5"],
-                    "d2d3": ["d7d5"]
+                # Francesa
+                {
+                    "mainline": ["e7e6"],
+                    "responses": {
+                        "d2d4": ["d7d5"],
+                        "b1c3": ["d7d5"],
+                        "e4e5": ["c7c5"]
+                    },
+                    "anti_theory": {
+                        "b1c3": ["d7d5"],                  # Contra Nc3
+                        "e4d5": ["e6d5"],                  # Captura obligada
+                    },
+                    "follow_up": {
+                        "e4e5 c7c5": ["f1b5"],             # Alfil a b5 (Tarrasch)
+                        "b1c3 g8f6": ["f1d3"],             # Alfil a d3
+                        "e4e5 f8b4": ["c1d2"],             # Alfil a d2
+                    }
                 },
-                "follow_up": {
-                    "e4e5": ["c8f5"],                  # Contra Advance
-                    "e4d5": ["c6d5"],                  # Captura obligada
-                    "b1d2": ["d7d5"],                  # Contra Two Knights
-                    "c1f4": ["g8f6"],                  # Desarrollo del caballo
-                },
-                "anti_theory": {
-                    "e4e6": ["d7d5"],                  # Contra Exchange Variation
-                    "b1d2": ["g8f6"],                  # Desarrollo del caballo
-                }
-            },
-            # Francesa
-            "alternative2": {
-                "mainline": ["e7e6"],
-                "responses": {
-                    "d2d4": ["d7d5"],
-                    "b1c3": ["d7d5"],
-                    "e4e5": ["c7c5"]
-                },
-                "anti_theory": {
-                    "b1c3": ["d7d5"],                  # Contra Nc3
-                    "e4d5": ["e6d5"],                  # Captura obligada
-                },
-                "follow_up": {
-                    "e4e5 c7c5": ["f1b5"],             # Alfil a b5 (Tarrasch)
-                    "b1c3 g8f6": ["f1d3"],             # Alfil a d3
-                    "e4e5 f8b4": ["c1d2"],             # Alfil a d2
-                }
-            },
+            ],
             # Respuestas a 1.d4
-            "d2d4": {
-                # India de Rey
-                "mainline": ["g8f6"],
-                "responses": {
-                    "c2c4": ["g7g6"],                  # Setup India de Rey
-                    "g1f3": ["g7g6"],                  # Transposición
-                    "b1c3": ["g7g6"]                   # Transposición
-                },
-                "follow_up": {
-                    "g1f3 g7g6": ["f8g7"],             # Fianchetto
-                    "c2c4 g7g6": ["f8g7"],             # Fianchetto
-                    "f1g2": ["f8g7"],                  # Alfil a g2
-                },
-                "anti_theory": {
-                    "c4c5": ["f6e4"],                  # Caballo a e4
-                    "e2e4": ["d7d6"],                  # Contra King's Indian Attack
-                }
-            },
-            # Nimzoindia
-            "alternative_d4": {
-                "mainline": ["g8f6"],
-                "responses": {
-                    "c2c4": ["e7e6"],
-                    "b1c3": ["f8b4"],                  # Pin al caballo
-                    "g1f3": ["e7e6"]
+            "d2d4": [
+                {
+                    # India de Rey
+                    "mainline": ["g8f6"],
+                    "responses": {
+                        "c2c4": ["g7g6"],                  # Setup India de Rey
+                        "g1f3": ["g7g6"],                  # Transposición
+                        "b1c3": ["g7g6"]                   # Transposición
+                    },
+                    "follow_up": {
+                        "g1f3 g7g6": ["f8g7"],             # Fianchetto
+                        "c2c4 g7g6": ["f8g7"],             # Fianchetto
+                        "f1g2": ["f8g7"],                  # Alfil a g2
+                    },
+                    "anti_theory": {
+                        "c4c5": ["f6e4"],                  # Caballo a e4
+                        "e2e4": ["d7d6"],                  # Contra King's Indian Attack
+                    }
                 },
-                "follow_up": {
-                    "c2c4 e7e6": ["f8b4"],              # Setup Nimzoindia
-                    "e2e3": ["c7c5"],                   # Break central
-                    "f1d3": ["b8c6"],                   # Desarrollo del caballo
+                # Nimzoindia
+                {
+                    "mainline": ["g8f6"],
+                    "responses": {
+                        "c2c4": ["e7e6"],
+                        "b1c3": ["f8b4"],                  # Pin al caballo
+                        "g1f3": ["e7e6"]
+                    },
+                    "follow_up": {
+                        "c2c4 e7e6": ["f8b4"],              # Setup Nimzoindia
+                        "e2e3": ["c7c5"],                   # Break central
+                        "f1d3": ["b8c6"],                   # Desarrollo del caballo
+                    },
+                    "anti_theory": {
+                        "c4c5": ["f6e4"],                   # Caballo a e4
+                        "b1d2": ["e7e6"],                   # Contra desarrollo alternativo
+                    }
                 },
-                "anti_theory": {
-                    "c4c5": ["f6e4"],                   # Caballo a e4
-                    "b1d2": ["e7e6"],                   # Contra desarrollo alternativo
-                }
-            },
-            # Grünfeld
-            "alternative_grunfeld": {
-                "mainline": ["g8f6"],
-                "responses": {
-                    "c2c4": ["d7d5"],                   # Centro agresivo
-                    "g1f3": ["d7d5"],                   # Transposición
-                    "b1c3": ["d7d5"]                    # Transposición
+                # Grünfeld
+                {
+                    "mainline": ["g8f6"],
+                    "responses": {
+                        "c2c4": ["d7d5"],                   # Centro agresivo
+                        "g1f3": ["d7d5"],                   # Transposición
+                        "b1c3": ["d7d5"]                    # Transposición
+                    },
+                    "follow_up": {
+                        "c4d5 f6d5": ["e2e4"],              # Control del centro
+                        "g1f3 d7d5": ["c1g5"],              # Alfil a g5
+                        "b1c3 d7d5": ["f1d3"],              # Alfil a d3
+                    },
+                    "anti_theory": {
+                        "e2e3": ["d7d5"],                   # Contra Colle System
+                        "f1d3": ["b8c6"],                   # Desarrollo del caballo
+                    }
                 },
-                "follow_up": {
-                    "c4d5 f6d5": ["e2e4"],              # Control del centro
-                    "g1f3 d7d5": ["c1g5"],              # Alfil a g5
-                    "b1c3 d7d5": ["f1d3"],              # Alfil a d3
+                # Holandesa
+                {
+                    "mainline": ["f7f5"],
+                    "responses": {
+                        "g1f3": ["g8f6"],                   # Desarrollo del caballo
+                        "d2d3": ["e7e6"],                   # Estructura sólida
+                        "c2c4": ["e7e6"]                    # Transposición
+                    },
+                    "follow_up": {
+                        "g1f3 g8f6": ["f1d3"],              # Alfil a d3
+                        "c2c4 e7e6": ["f1g2"],              # Alfil a g2
+                        "d2d3 e7e6": ["c1e3"],              # Alfil a e3
+                    },
+                    "anti_theory": {
+                        "e2e4": ["f5e4"],                   # Captura en e4
+                        "f1b5": ["c7c6"],                   # Contra fianchetto temprano
+                    }
                 },
-                "anti_theory": {
-                    "e2e3": ["d7d5"],                   # Contra Colle System
-                    "f1d3": ["b8c6"],                   # Desarrollo del caballo
-                }
-            },
-            # Holandesa
-            "alternative_holland": {
-                "mainline": ["f7f5"],
-                "responses": {
-                    "g1f3": ["g8f6"],                   # Desarrollo del caballo
-                    "d2d3": ["e7e6"],                   # Estructura sólida
-                    "c2c4": ["e7e6"]                    # Transposición
-                },
-                "follow_up": {
-                    "g1f3 g8f6": ["f1d3"],              # Alfil a d3
-                    "c2c4 e7e6": ["f1g2"],              # Alfil a g2
-                    "d2d3 e7e6": ["c1e3"],              # Alfil a e3
-                },
-                "anti_theory": {
-                    "e2e4": ["f5e4"],                   # Captura en e4
-                    "f1b5": ["c7c6"],                   # Contra fianchetto temprano
-                }
-            }
+            ]
         }
+        self.opening_book = self.compile_openings()
 
-    def get_opening_move(self, board):
-        """Sistema de aperturas mejorado que considera múltiples respuestas"""
-        moves_str = " ".join([move.uci() for move in board.move_stack])
-        moves_list = moves_str.split()
-        
-        if not moves_list:
-            return None
-            
-        # Primera jugada blanca determina la línea principal
-        first_white = moves_list[0]
-        opening_system = self.openings.get(first_white)
-        
-        if not opening_system:
-            return None
-            
-        # Si es nuestra primera jugada, elegir una de las líneas principales
-        if len(moves_list) == 1:
-            mainline_moves = opening_system["mainline"]
-            chosen_move = random.choice(mainline_moves)
-            return chess.Move.from_uci(chosen_move)
-            
-        # Buscar respuestas a la última jugada del oponente
-        last_move = moves_list[-1]
-        
-        # Verificar respuestas específicas
-        if last_move in opening_system["responses"]:
-            possible_responses = opening_system["responses"][last_move]
-            chosen_response = random.choice(possible_responses)
-            if self.is_move_legal(board, chosen_response):
-                return chess.Move.from_uci(chosen_response)
-                
-        # Verificar anti-teoría
-        if "anti_theory" in opening_system and last_move in opening_system["anti_theory"]:
-            anti_theory_move = opening_system["anti_theory"][last_move]
-            if self.is_move_legal(board, anti_theory_move):
-                return chess.Move.from_uci(anti_theory_move)
-                
-        # Verificar continuaciones
-        if "follow_up" in opening_system:
-            for sequence, response in opening_system["follow_up"].items():
-                if moves_str.endswith(sequence):
-                    if self.is_move_legal(board, response):
-                        return chess.Move.from_uci(response)
-        
-        # Si no encontramos una respuesta en la teoría, volvemos al análisis regular
-        return None
+    def compile_openings(self):
+        """
+        Compila el repertorio en un libro indexado por posición (clave Zobrist).
 
-    def is_move_legal(self, board, move_str):
-        """Verifica si un movimiento en notación UCI es legal"""
-        try:
-            move = chess.Move.from_uci(move_str)
-            return move in board.legal_moves
-        except:
-            return False
+        Cada sistema se reproduce desde la posición inicial: primera jugada
+        blanca, línea principal y luego respuestas, anti-teoría y continuaciones.
+        Así la consulta funciona desde un FEN sin historial y las entradas que
+        no son legales en su posición se descartan al cargar.
+        """
+        book = OpeningBook()
+        for first_move, systems in self.openings.items():
+            start = chess.Board()
+            start.push_uci(first_move)
+            for system in systems:
+                for reply in system["mainline"]:
+                    self.add_book_line(book, start, [], [reply])
+                after_mainline = start.copy()
+                after_mainline.push_uci(system["mainline"][0])
+                for section in ("responses", "anti_theory", "follow_up"):
+                    for sequence, replies in system.get(section, {}).items():
+                        self.add_book_line(book, after_mainline, sequence.split(), replies)
+        return book
+
+    def add_book_line(self, book, board, sequence, replies):
+        board = board.copy()
+        for uci in sequence:
+            move = chess.Move.from_uci(uci)
+            if move not in board.legal_moves:
+                return
+            board.push(move)
+        for uci in replies:
+            move = chess.Move.from_uci(uci)
+            if move in board.legal_moves:
+                book.add(board, move)
+
+    def get_opening_move(self, board):
+        """Busca la posición en el repertorio compilado"""
+        return self.opening_book.weighted_choice(board)
         
     def minimax(self, board, depth, maximizing_player, alpha=float('-inf'), beta=float('inf')):
         """
@@ -215,17 +223,29 @@ class ElenaBot(BaseBot):
         :param beta: Mejor valor encontrado para el jugador minimizador.
         :return: La mejor puntuación y el mejor movimiento.
         """
-        if depth == 0 or board.is_game_over():
+        self.nodes_evaluated += 1
+        if not self.nodes_evaluated & 1023 and (time.time() > self.deadline or self.nodes_evaluated > self.node_limit
+                                                or self.stopped()):
+            raise SearchTimeout()
+        if depth == 0:
             return self.evaluate_position(board), None
+        legal_moves = self.move_cache.legal_moves(board)
+        if not legal_moves:
+            # Mate, que vale más cuanto antes llegue (más profundidad restante), o ahogado
+            if board.is_check():
+                return (-20000 - depth if board.turn else 20000 + depth), None
+            return 0, None
+        if depth == 1 and self.batch_leaves and batch_eval.available():
+            return self.minimax_frontier(board, maximizing_player)
 
-        legal_moves = list(board.legal_moves)
         best_move = None
 
         if maximizing_player:
             max_eval = float('-inf')
             for move in legal_moves:
                 board.push(move)
-                eval_score, _ = self.minimax(board, depth - 1, False, alpha, beta)
+                # Las tablas (repetición, 50 movimientos...) se ven sin generar jugadas
+                eval_score = 0 if board.is_draw() else self.minimax(board, depth - 1, False, alpha, beta)[0]
                 board.pop()
                 if eval_score > max_eval:
                     max_eval = eval_score
@@ -238,7 +258,7 @@ class ElenaBot(BaseBot):
             min_eval = float('inf')
             for move in legal_moves:
                 board.push(move)
-                eval_score, _ = self.minimax(board, depth - 1, True, alpha, beta)
+                eval_score = 0 if board.is_draw() else self.minimax(board, depth - 1, True, alpha, beta)[0]
                 board.pop()
                 if eval_score < min_eval:
                     min_eval = eval_score
@@ -248,61 +268,136 @@ class ElenaBot(BaseBot):
                     break  # Poda Alpha-Beta
             return min_eval, best_move
 
-    def evaluate_position(self, board):
+    def minimax_frontier(self, board, maximizing_player):
         """
-        Evalúa la posición actual del tablero.
+        Último nivel de ``minimax`` en lote: juega cada jugada, guarda la
+        posición hija y las evalúa todas con ``evaluate_batch``. No poda en
+        este nivel, pero el valor y la jugada elegida en la raíz son los mismos.
         """
-        if board.is_checkmate():
-            return -20000 if board.turn else 20000
+        if time.time() > self.deadline or self.nodes_evaluated > self.node_limit or self.stopped():
+            raise SearchTimeout()
+        if self.psqt_array is None:
+            self.psqt_array = batch_eval.table_array(self.psqt)
+        batch = batch_eval.BoardBatch()
+        terms = []
+        moves = self.move_cache.legal_moves(board)
+        for move in moves:
+            board.push(move)
+            batch.add(board)
+            terms.append((0, 0) if board.is_draw() else self.position_terms(board))
+            board.pop()
+        self.nodes_evaluated += len(moves)
 
-        score = 0
+        best_score, best_move = None, None
+        for move, score in zip(moves, self.batch_scores(batch, terms)):
+            if best_score is None or (score > best_score if maximizing_player else score < best_score):
+                best_score, best_move = score, move
+        return best_score, best_move
 
-        # Evaluar material y posición
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece is not None:  # Verificamos que la pieza existe
-                value = self.piece_values[piece.piece_type]
+    def position_terms(self, board):
+        """(valor del mate o None, control del centro) de ``board``."""
+        if board.is_check() and not self.move_cache.legal_moves(board):
+            return (-20000 if board.turn else 20000), 0
+        return None, center_control(board)
 
-                # Bonificaciones posicionales
-                if piece.piece_type == chess.PAWN:
-                    if square in [chess.D4, chess.E4, chess.D5, chess.E5]:  # Control del centro
-                        value += 20
+    def evaluate_batch(self, boards):
+        """
+        Evalúa un lote de posiciones con el mismo resultado que
+        ``evaluate_position``; material, tablas y desarrollo se calculan para
+        todo el lote a la vez con NumPy (``bots.batch_eval``).
+        """
+        if self.psqt_array is None:
+            self.psqt_array = batch_eval.table_array(self.psqt)
+        if self.psqt_array is None or not boards:
+            return [self.evaluate_position(board) for board in boards]
+        return self.batch_scores(batch_eval.BoardBatch(boards), [self.position_terms(board) for board in boards])
 
-                score += value if piece.color else -value
+    def batch_scores(self, batch, terms):
+        pieces, colors, turn, plies = batch.arrays()
+        black, white = colors[:, 0], colors[:, 1]
+        minor_pieces = pieces[:, 1] | pieces[:, 2]
+        scores = batch_eval.psqt_scores(pieces, colors, self.psqt_array)
+        # Desarrollo en apertura
+        development = batch_eval.popcount(minor_pieces & white & ~batch_eval.uint64(chess.BB_RANK_1 | chess.BB_RANK_2)) * 20
+        development -= batch_eval.popcount(minor_pieces & black & ~batch_eval.uint64(chess.BB_RANK_7 | chess.BB_RANK_8)) * 20
+        scores += development * (plies < 20)
+
+        results = []
+        for (mate, center), score, white_to_move in zip(terms, scores.tolist(), turn.tolist()):
+            if mate is not None:
+                results.append(mate)
+            else:
+                score += center
+                results.append(score if white_to_move else -score)
+        return results
+
+    def evaluate_position(self, board):
+        """
+        Evalúa la posición actual del tablero.
+        """
+        if board.is_check() and not self.move_cache.legal_moves(board):
+            return -20000 if board.turn else 20000
+
+        # Evaluar material y posición (incremental en SearchBoard)
+        score = psqt_score(board, self.psqt)
 
         # Control del centro
-        central_squares = [chess.D4, chess.E4, chess.D5, chess.E5]
-        for square in central_squares:
-            if board.is_attacked_by(chess.WHITE, square):
-                score += 10
-            if board.is_attacked_by(chess.BLACK, square):
-                score -= 10
+        score += center_control(board)
 
         # Desarrollo en apertura
         if len(board.move_stack) < 20:
-            for square in chess.SQUARES:
-                piece = board.piece_at(square)
-                if piece:
-                    if piece.piece_type in [chess.KNIGHT, chess.BISHOP]:
-                        if piece.color and square > chess.H2:
-                            score += 20
-                        elif not piece.color and square < chess.A7:
-                            score -= 20
+            minor_pieces = board.knights | board.bishops
+            score += chess.popcount(minor_pieces & board.occupied_co[chess.WHITE] & ~(chess.BB_RANK_1 | chess.BB_RANK_2)) * 20
+            score -= chess.popcount(minor_pieces & board.occupied_co[chess.BLACK] & ~(chess.BB_RANK_7 | chess.BB_RANK_8)) * 20
 
         return score if board.turn else -score
 
-    def get_move(self, board):
+    def new_game(self):
+        # La caché de jugadas no se puede compartir entre partidas (hilos)
+        bot = super().new_game()
+        bot.move_cache = MoveCache(self.move_cache.size)
+        return bot
+
+    def stopped(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def get_move(self, board, limit=None, stop_event=None, on_info=None):
         """
         Obtiene el mejor movimiento usando Minimax.
         """
-        # Usar el tiempo de pensamiento de la clase base
-        time.sleep(self.think_time())
-
+        stats = SearchStats()
         # Intentar jugada de apertura
         opening_move = self.get_opening_move(board)
         if opening_move and opening_move in board.legal_moves:
+            stats.book = True
+            self.report_stats(stats)
             return opening_move
 
-        # Aplicar Minimax para encontrar el mejor movimiento
-        _, best_move = self.minimax(board, depth=3, maximizing_player=board.turn)
-        return best_move or random.choice(list(board.legal_moves))
\ No newline at end of file
+        # Aplicar Minimax para encontrar el mejor movimiento, profundidad a
+        # profundidad para poder parar cuando se acabe el tiempo de la jugada
+        start_time = time.time()
+        budget = allocate(board, limit, self.time_budget)
+        self.deadline = budget.hard
+        self.node_limit = node_limit(limit)
+        self.stop_event = stop_event
+        self.nodes_evaluated = 0
+        search_board = SearchBoard.from_board(board, psqt=self.psqt)
+        best_move = None
+        for depth in range(1, depth_limit(limit, self.search_depth) + 1):
+            try:
+                score, move = self.minimax(search_board, depth=depth, maximizing_player=search_board.turn)
+            except SearchTimeout:
+                break
+            if move is None:
+                break
+            best_move = move
+            stats.depth = depth
+            stats.score = score
+            if on_info is not None:
+                on_info({'depth': depth, 'score': score, 'move': move.uci(), 'pv': [move.uci()],
+                         'nodes': self.nodes_evaluated, 'time': round(time.time() - start_time, 3)})
+            if time.time() > budget.soft:
+                break
+        stats.nodes = self.nodes_evaluated
+        self.report_stats(stats)
+        return best_move or random.choice(list(board.legal_moves))
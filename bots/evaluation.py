@@ -0,0 +1,99 @@
+# bots/evaluation.py
+"""
+Tablas pieza-casilla y utilidades de evaluación con bitboards.
+
+Las tablas tienen 12 x 64 valores con signo (positivo para las blancas) en el
+orden de piezas de Polyglot, el mismo que usa ``SearchBoard`` para mantener la
+suma de forma incremental en ``push``/``pop``.
+
+Tolerancia respecto a las evaluaciones previas (recorriendo las 64 casillas):
+el valor es idéntico (diferencia 0) para Elena y Ricardo en posiciones sin
+mate. Solo cambia el signo del mate de Ricardo cuando mueven las negras, que
+ya se corrigió en la búsqueda negamax. Las rarezas de los términos originales
+(p. ej. la columna "abierta" de Ricardo) se reproducen a propósito para no
+cambiar el juego de los bots.
+"""
+import chess
+
+from .search_board import piece_index
+
+CENTER_SQUARES = [chess.D4, chess.E4, chess.D5, chess.E5]
+CENTER_MASK = chess.BB_D4 | chess.BB_E4 | chess.BB_D5 | chess.BB_E5
+
+
+def build_psqt(square_value):
+    """Construye una tabla a partir de ``square_value(piece_type, color, square)``."""
+    table = [0] * (12 * 64)
+    for piece_type in chess.PIECE_TYPES:
+        for color in chess.COLORS:
+            index = piece_index(piece_type, color)
+            sign = 1 if color == chess.WHITE else -1
+            for square in chess.SQUARES:
+                table[64 * index + square] = sign * square_value(piece_type, color, square)
+    return tuple(table)
+
+
+def ricardo_psqt(piece_values):
+    """Material, avance de peones y centralidad de la evaluación de Ricardo."""
+    def square_value(piece_type, color, square):
+        value = piece_values[piece_type]
+        file, rank = chess.square_file(square), chess.square_rank(square)
+        if piece_type == chess.PAWN:
+            value += (rank if color == chess.WHITE else 7 - rank) * 10
+        distance_to_center = abs(3.5 - file) + abs(3.5 - rank)
+        return value + int((7 - distance_to_center) * 5)
+    return build_psqt(square_value)
+
+
+def elena_psqt(piece_values):
+    """Material y peones centrales de la evaluación de Elena."""
+    def square_value(piece_type, color, square):
+        value = piece_values[piece_type]
+        if piece_type == chess.PAWN and square in CENTER_SQUARES:
+            value += 20
+        return value
+    return build_psqt(square_value)
+
+
+def psqt_score(board, table):
+    """Suma completa de la tabla; la usa quien no tenga un ``SearchBoard``."""
+    if getattr(board, 'psqt_table', None) is table:
+        return board.psqt
+    score = 0
+    for color in chess.COLORS:
+        for square in chess.scan_reversed(board.occupied_co[color]):
+            score += table[64 * piece_index(board.piece_type_at(square), color) + square]
+    return score
+
+
+def center_control(board):
+    score = 0
+    for square in CENTER_SQUARES:
+        if board.is_attacked_by(chess.WHITE, square):
+            score += 10
+        if board.is_attacked_by(chess.BLACK, square):
+            score -= 10
+    return score
+
+
+def doubled_pawns(pawns):
+    """Peones sobrantes en columnas con más de un peón."""
+    doubled = 0
+    for file_mask in chess.BB_FILES:
+        count = chess.popcount(pawns & file_mask)
+        if count > 1:
+            doubled += count - 1
+    return doubled
+
+
+def open_files(occupied):
+    """
+    Máscara de columnas "abiertas" tal como las calculaba Ricardo: la columna
+    ``f`` cuenta si la fila de índice ``f`` está vacía (``chess.square`` recibe
+    primero la columna, así que el bucle original recorría filas).
+    """
+    mask = 0
+    for index, file_mask in enumerate(chess.BB_FILES):
+        if not occupied & chess.BB_RANKS[index]:
+            mask |= file_mask
+    return mask
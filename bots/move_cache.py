@@ -0,0 +1,56 @@
+# bots/move_cache.py
+"""
+Caché de generación de jugadas por posición.
+
+En cada nodo varias partes de la búsqueda necesitan las jugadas legales: el
+fin de partida (mate o ahogado), la movilidad de la evaluación y la
+ordenación de jugadas. La caché las genera una vez por posición, indexadas
+por la clave Zobrist de ``SearchBoard``, y las comparte; también sirve
+cuando la misma posición vuelve a aparecer (transposiciones, re-búsquedas de
+PVS y LMR, iteraciones sucesivas).
+
+Las tuplas guardan los ``chess.Move`` compartidos de ``packed_move``, así
+una entrada ocupa un puntero por jugada. Cada partida necesita su propia
+caché: las tuplas no se copian al leerlas y dos hilos escribiendo en la
+misma ranura podrían mezclar clave y jugadas.
+"""
+from .packed_move import pack, unpack
+
+
+class MoveCache:
+    """Tabla de tamaño fijo (potencia de dos) de tuplas de jugadas legales."""
+
+    def __init__(self, size=1 << 12):
+        size = 1 << max(0, int(size).bit_length() - 1)
+        self.size = size
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.entries = [None] * size
+        self.hits = 0
+        self.misses = 0
+
+    def legal_moves(self, board):
+        """
+        Jugadas legales de ``board`` en el orden de ``generate_legal_moves``.
+        Es una tupla compartida entre todos los que la piden.
+        """
+        key = getattr(board, 'zobrist', None)
+        if key is None:
+            return list(board.generate_legal_moves())
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.entries[index]
+        self.misses += 1
+        moves = tuple([unpack(pack(move)) for move in board.generate_legal_moves()])
+        self.keys[index] = key
+        self.entries[index] = moves
+        return moves
+
+    def cached(self, board):
+        """Las jugadas de ``board`` si ya están en la caché, sin generarlas."""
+        key = board.zobrist
+        index = key & self.mask
+        if self.keys[index] == key:
+            return self.entries[index]
+        return None
@@ -0,0 +1,245 @@
+# bots/move_ordering.py
+from array import array
+
+import chess
+
+from .packed_move import pack, unpack
+
+MAX_PLY = 64
+HISTORY_LIMIT = 1 << 16
+CHECK_BONUS = 1 << 20
+# Una captura "pierde" si el SEE queda por debajo de esto; así alfil por
+# caballo (330 por 320) cuenta como cambio igualado
+SEE_LOSING_MARGIN = -50
+
+# Bonificación de centralidad de la casilla de destino para las jugadas tranquilas
+CENTER_BONUS = [
+    int((4 - (abs(3.5 - chess.square_rank(square)) + abs(3.5 - chess.square_file(square)))) * 10)
+    for square in chess.SQUARES
+]
+
+
+def gives_check(board, move):
+    """
+    Versión de ``Board.gives_check`` con bitboards, sin hacer push/pop.
+
+    Enroques, capturas al paso y coronaciones son raros y se delegan en la
+    implementación de python-chess.
+    """
+    them = not board.turn
+    king_mask = board.kings & board.occupied_co[them]
+    if not king_mask:
+        return False
+    king = chess.msb(king_mask)
+
+    from_bb = chess.BB_SQUARES[move.from_square]
+    to_bb = chess.BB_SQUARES[move.to_square]
+    piece_type = board.piece_type_at(move.from_square)
+    if move.promotion or (piece_type == chess.KING and board.occupied_co[board.turn] & to_bb):
+        return board.gives_check(move)
+    if piece_type == chess.KING and abs(move.to_square - move.from_square) == 2:
+        return board.gives_check(move)
+    if piece_type == chess.PAWN and move.to_square == board.ep_square:
+        return board.gives_check(move)
+
+    # Jaques directos de piezas que no deslizan
+    if piece_type == chess.KNIGHT:
+        if chess.BB_KNIGHT_ATTACKS[move.to_square] & king_mask:
+            return True
+    elif piece_type == chess.PAWN:
+        if chess.BB_PAWN_ATTACKS[board.turn][move.to_square] & king_mask:
+            return True
+
+    # Jaques directos y descubiertos de piezas que deslizan
+    ours = board.occupied_co[board.turn] & ~from_bb
+    occupied = (board.occupied & ~from_bb) | to_bb
+    diagonal = (board.bishops | board.queens) & ours
+    straight = (board.rooks | board.queens) & ours
+    if piece_type == chess.BISHOP or piece_type == chess.QUEEN:
+        diagonal |= to_bb
+    if piece_type == chess.ROOK or piece_type == chess.QUEEN:
+        straight |= to_bb
+    return bool(
+        chess.BB_DIAG_ATTACKS[king][chess.BB_DIAG_MASKS[king] & occupied] & diagonal or
+        chess.BB_FILE_ATTACKS[king][chess.BB_FILE_MASKS[king] & occupied] & straight or
+        chess.BB_RANK_ATTACKS[king][chess.BB_RANK_MASKS[king] & occupied] & straight
+    )
+
+
+def see(board, move, piece_values):
+    """
+    Intercambio estático (SEE): material que gana el bando que mueve con la
+    captura ``move`` si ambos bandos siguen capturando en la casilla con la
+    pieza menos valiosa. Las piezas que quedan detrás (rayos X) entran al
+    quitar las de delante de ``occupied``; las clavadas no se tienen en cuenta.
+
+    ``piece_values`` es una lista indexada por tipo de pieza.
+    """
+    to_square = move.to_square
+    occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+    if board.is_en_passant(move):
+        occupied ^= chess.BB_SQUARES[to_square + (-8 if board.turn == chess.WHITE else 8)]
+        victim = chess.PAWN
+    else:
+        victim = board.piece_type_at(to_square) or 0
+    attacker = board.piece_type_at(move.from_square)
+
+    gains = [piece_values[victim]]
+    if move.promotion:
+        gains[0] += piece_values[move.promotion] - piece_values[chess.PAWN]
+        attacker = move.promotion
+
+    color = not board.turn
+    while True:
+        attackers = board.attackers_mask(color, to_square, occupied) & occupied
+        if not attackers:
+            break
+        # Recaptura con la pieza menos valiosa
+        for piece_type in chess.PIECE_TYPES:
+            candidates = attackers & board.pieces_mask(piece_type, color)
+            if candidates:
+                break
+        gains.append(piece_values[attacker] - gains[-1])
+        occupied ^= candidates & -candidates
+        attacker = piece_type
+        color = not color
+
+    # Cada bando elige entre capturar o parar, desde el final del intercambio
+    while len(gains) > 1:
+        gain = gains.pop()
+        gains[-1] = -max(-gains[-1], gain)
+    return gains[0]
+
+
+class MoveOrderer:
+    """
+    Ordenación de jugadas por etapas.
+
+    Primero la jugada de la tabla de transposición, luego capturas y
+    coronaciones por MVV-LVA, después las jugadas asesinas del ply, las
+    capturas que pierden material según el SEE y por último las jugadas
+    tranquilas por historial. Las etapas se generan bajo demanda: si un nodo
+    corta con la primera jugada no se puntúa nada más.
+    """
+
+    def __init__(self, piece_values):
+        self.piece_values = [0] * 7
+        for piece_type, value in piece_values.items():
+            self.piece_values[piece_type] = value
+        # Dos asesinas por ply, empaquetadas (índice 2 * ply y 2 * ply + 1)
+        self.killers = array('H', bytes(4 * MAX_PLY))
+        # Índice: color * 4096 + desde * 64 + hasta
+        self.history = [0] * (2 * 64 * 64)
+
+    def new_search(self):
+        """Olvida las asesinas y envejece el historial de la búsqueda anterior."""
+        self.killers = array('H', bytes(4 * MAX_PLY))
+        self.history = [value >> 1 for value in self.history]
+
+    def killer_moves(self, ply):
+        if ply >= MAX_PLY:
+            return ()
+        killers = self.killers
+        return tuple(unpack(code) for code in (killers[2 * ply], killers[2 * ply + 1]) if code)
+
+    def is_quiet(self, board, move):
+        return not move.promotion and not board.is_capture(move)
+
+    def capture_score(self, board, move):
+        """MVV-LVA: víctima más valiosa, atacante menos valioso."""
+        victim = board.piece_type_at(move.to_square) or chess.PAWN  # Al paso
+        attacker = board.piece_type_at(move.from_square)
+        score = 10 * self.piece_values[victim] - self.piece_values[attacker] // 10
+        if move.promotion:
+            score += self.piece_values[move.promotion]
+        return score
+
+    def losing_capture(self, board, move):
+        """Captura que pierde material; si la víctima vale casi lo mismo no hace falta el SEE."""
+        attacker = self.piece_values[board.piece_type_at(move.from_square)]
+        victim = self.piece_values[board.piece_type_at(move.to_square) or chess.PAWN]
+        if attacker + SEE_LOSING_MARGIN <= victim or move.promotion:
+            return False
+        return see(board, move, self.piece_values) < SEE_LOSING_MARGIN
+
+    def record_cutoff(self, board, move, depth, ply):
+        """Actualiza asesinas e historial tras un corte beta de una jugada tranquila."""
+        if not self.is_quiet(board, move):
+            return
+        if ply < MAX_PLY:
+            killers = self.killers
+            code = pack(move)
+            if killers[2 * ply] != code:
+                killers[2 * ply + 1] = killers[2 * ply]
+                killers[2 * ply] = code
+        index = board.turn * 4096 + move.from_square * 64 + move.to_square
+        self.history[index] += depth * depth
+        if self.history[index] > HISTORY_LIMIT:
+            self.history = [value >> 1 for value in self.history]
+
+    def moves(self, board, tt_move=None, ply=0, legal_moves=None):
+        """
+        Genera las jugadas legales en orden, etapa a etapa. Con
+        ``legal_moves`` (ya generadas, ver ``MoveCache``) las etapas se
+        reparten esa lista en lugar de volver a generar.
+        """
+        # Etapa 1: jugada de la tabla de transposición
+        if tt_move is not None and board.is_legal(tt_move):
+            yield tt_move
+        else:
+            tt_move = None
+
+        # Etapa 2: capturas y coronaciones; las que pierden material se aplazan
+        if legal_moves is None:
+            ours = board.occupied_co[board.turn]
+            noisy = list(board.generate_legal_captures())
+            noisy.extend(board.generate_legal_moves(board.pawns & ours, chess.BB_BACKRANKS & ~board.occupied))
+            quiets = None
+        else:
+            noisy, quiets = [], []
+            for move in legal_moves:
+                if move.promotion or board.is_capture(move):
+                    noisy.append(move)
+                else:
+                    quiets.append(move)
+        losing = []
+        if noisy:
+            noisy.sort(key=lambda move: self.capture_score(board, move), reverse=True)
+            for move in noisy:
+                if move == tt_move:
+                    continue
+                if self.losing_capture(board, move):
+                    losing.append(move)
+                else:
+                    yield move
+
+        # Etapa 3: jugadas asesinas
+        played_killers = []
+        for move in self.killer_moves(ply):
+            if move != tt_move and move not in played_killers and self.is_quiet(board, move) and board.is_legal(move):
+                played_killers.append(move)
+                yield move
+
+        # Etapa 4: capturas perdedoras (ya en orden MVV-LVA). Con la
+        # evaluación de Ricardo cortan más a menudo que las jugadas
+        # tranquilas, así que no se dejan para el final
+        yield from losing
+
+        # Etapa 5: jugadas tranquilas por historial (y jaques primero). Cada
+        # jugada se ordena como un entero: puntuación en los bits altos e
+        # índice en los 8 bajos (a igual puntuación, orden de generación)
+        history = self.history
+        offset = board.turn * 4096
+        if quiets is None:
+            quiets = [move for move in board.generate_legal_moves(chess.BB_ALL, ~board.occupied_co[not board.turn])
+                      if not (move.promotion or board.is_en_passant(move))]
+        quiets = [move for move in quiets if move != tt_move and move not in played_killers]
+        keys = []
+        for index, move in enumerate(quiets):
+            score = history[offset + move.from_square * 64 + move.to_square] + CENTER_BONUS[move.to_square]
+            if gives_check(board, move):
+                score += CHECK_BONUS
+            keys.append(score << 8 | 255 - index)
+        keys.sort(reverse=True)
+        for key in keys:
+            yield quiets[255 - (key & 255)]
@@ -0,0 +1,165 @@
+# bots/opening_book.py
+"""
+Libros de aperturas indexados por clave Zobrist (formato Polyglot).
+
+La clave no incluye los contadores de medio movimiento ni de jugadas, así que
+una posición se encuentra sin importar cómo se llegó a ella. En producción el
+libro es un ``.bin`` de Polyglot que se mapea en memoria y se busca por
+bisección; los ``.json``/``.pgn`` se compilan a ese formato con::
+
+    python -m bots.compile_book static/openings.json -o static/openings.bin
+"""
+import json
+import os
+import random
+import struct
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+ENTRY_STRUCT = struct.Struct('>QHHI')
+MAX_WEIGHT = 0xFFFF
+
+
+def encode_move(board, move):
+    """Codifica una jugada en los 16 bits de Polyglot (enroque como rey a torre)."""
+    to_square = move.to_square
+    if board.is_castling(move) and not board.chess960:
+        rook_file = 7 if chess.square_file(move.to_square) > chess.square_file(move.from_square) else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion << 12)
+
+
+class OpeningBook:
+    """Libro en memoria: clave Zobrist -> {jugada: peso}."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, board, move, weight=1):
+        moves = self.entries.setdefault(chess.polyglot.zobrist_hash(board), {})
+        moves[move] = moves.get(move, 0) + weight
+
+    def moves(self, board):
+        """Jugadas legales del libro para la posición, con su peso."""
+        candidates = self.entries.get(chess.polyglot.zobrist_hash(board), {})
+        return [(move, weight) for move, weight in candidates.items() if board.is_legal(move)]
+
+    def weighted_choice(self, board):
+        candidates = self.moves(board)
+        if not candidates:
+            return None
+        moves, weights = zip(*candidates)
+        return random.choices(moves, weights=weights)[0]
+
+    def write_polyglot(self, path, board_for_key):
+        """
+        Escribe el libro como ``.bin`` de Polyglot, ordenado por clave.
+
+        ``board_for_key`` da para cada clave un tablero de la posición, que se
+        necesita para codificar los enroques.
+        """
+        rows = []
+        for key, moves in self.entries.items():
+            board = board_for_key[key]
+            for move, weight in moves.items():
+                rows.append((key, encode_move(board, move), min(weight, MAX_WEIGHT)))
+        rows.sort()
+        with open(path, 'wb') as file:
+            for key, raw_move, weight in rows:
+                file.write(ENTRY_STRUCT.pack(key, raw_move, weight, 0))
+        return len(rows)
+
+
+class PolyglotBook:
+    """Libro ``.bin`` de Polyglot mapeado en memoria con búsqueda binaria."""
+
+    def __init__(self, path):
+        self.path = path
+        self.reader = chess.polyglot.open_reader(path)
+
+    def __len__(self):
+        return len(self.reader)
+
+    def moves(self, board):
+        return [(entry.move, entry.weight) for entry in self.reader.find_all(board)]
+
+    def weighted_choice(self, board):
+        try:
+            return self.reader.weighted_choice(board).move
+        except IndexError:
+            return None
+
+    def close(self):
+        self.reader.close()
+
+
+def _json_pairs(path):
+    """Pares (FEN, jugadas) del JSON, conservando las claves repetidas."""
+    with open(path, 'r') as file:
+        pairs = json.load(file, object_pairs_hook=list)
+    for fen, moves in pairs:
+        yield fen, [moves] if isinstance(moves, str) else moves
+
+
+def compile_sources(paths, max_ply=20):
+    """
+    Compila ficheros ``.json`` (FEN -> jugada o lista de jugadas) y ``.pgn``
+    en un ``OpeningBook``. Cada aparición suma 1 al peso de la jugada y las
+    entradas con FEN o jugadas no válidas se descartan.
+
+    Devuelve el libro y un tablero de ejemplo por clave.
+    """
+    book = OpeningBook()
+    boards = {}
+
+    def add(board, move):
+        if board.is_legal(move):
+            book.add(board, move)
+            boards.setdefault(chess.polyglot.zobrist_hash(board), board.copy(stack=False))
+
+    for path in paths:
+        if path.endswith('.pgn'):
+            with open(path, 'r') as file:
+                while True:
+                    game = chess.pgn.read_game(file)
+                    if game is None:
+                        break
+                    board = game.board()
+                    for ply, move in enumerate(game.mainline_moves()):
+                        if ply >= max_ply:
+                            break
+                        add(board, move)
+                        board.push(move)
+        else:
+            for fen, moves in _json_pairs(path):
+                try:
+                    board = chess.Board(fen)
+                except ValueError:
+                    continue
+                for uci in moves:
+                    try:
+                        add(board, chess.Move.from_uci(uci))
+                    except chess.InvalidMoveError:
+                        continue
+    return book, boards
+
+
+def load_book(path):
+    """
+    Abre un libro por extensión: ``.bin`` se mapea en memoria y ``.json`` o
+    ``.pgn`` se compilan en memoria. Si no existe devuelve un libro vacío.
+    """
+    if not os.path.exists(path):
+        return OpeningBook()
+    if path.endswith('.bin'):
+        return PolyglotBook(path)
+    book, _ = compile_sources([path])
+    return book
+
@@ -0,0 +1,29 @@
+# bots/packed_move.py
+"""
+Jugadas empaquetadas en 16 bits: casilla de origen (6 bits), de destino
+(6 bits) y pieza de coronación (3 bits). El código 0 significa "sin jugada".
+
+``unpack`` devuelve siempre el mismo ``chess.Move`` para cada código, así
+que leer de una estructura con códigos (tabla de transposición, asesinas)
+no crea objetos nuevos.
+"""
+import chess
+
+NO_MOVE = 0
+
+_moves = [None] * (1 << 15)
+
+
+def pack(move):
+    if move is None:
+        return NO_MOVE
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def unpack(code):
+    if not code:
+        return None
+    move = _moves[code]
+    if move is None:
+        move = _moves[code] = chess.Move(code & 63, code >> 6 & 63, code >> 12 or None)
+    return move
@@ -0,0 +1,122 @@
+# bots/position_cache.py
+"""
+Caché en disco de resultados de búsquedas raíz, compartida entre procesos.
+
+Es una base SQLite en modo WAL indexada por la versión del motor y la clave
+Zobrist: los lectores no bloquean a los escritores ni entre sí y cada
+proceso (o hilo) abre su propia conexión. Cada entrada guarda la mejor
+jugada, su valor y la profundidad; una búsqueda de igual o menor
+profundidad sobre la misma posición se responde sin buscar. Las entradas de
+otra versión (``version``, p. ej. ``ricardo.ENGINE_VERSION``) no se usan y
+acaban borradas por antigüedad.
+
+Las lecturas no escriben nada. El tamaño se acota al guardar: cuando se
+supera ``max_entries`` se borran las entradas escritas hace más tiempo.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import chess
+
+# Cada cuántas escrituras se comprueba el tamaño
+EVICTION_INTERVAL = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    version TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    move TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (version, key)
+)
+"""
+
+
+def _signed(key):
+    """SQLite guarda enteros de 64 bits con signo."""
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+class PositionCache:
+    def __init__(self, path, max_entries=100_000, version=''):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.local = threading.local()
+        self.writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self.connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        # Las bases anteriores a la versión no dicen de qué motor son sus entradas
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(positions)')]
+        if columns and 'version' not in columns:
+            connection.execute('DROP TABLE positions')
+        connection.execute(SCHEMA)
+
+    def __reduce__(self):
+        # Otro proceso abre su propia conexión
+        return PositionCache, (self.path, self.max_entries, self.version)
+
+    def connection(self):
+        # Una conexión por hilo y proceso: no se heredan tras un fork
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def get(self, key, depth):
+        """
+        (jugada, valor, profundidad) guardados para ``key`` con al menos
+        ``depth`` de profundidad, o None.
+        """
+        try:
+            row = self.connection().execute(
+                'SELECT move, score, depth FROM positions WHERE version = ? AND key = ? AND depth >= ?',
+                (self.version, _signed(key), depth)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        move, score, stored_depth = row
+        return chess.Move.from_uci(move), score, stored_depth
+
+    def put(self, key, move, score, depth):
+        """Guarda el resultado si no hay ya uno al menos igual de profundo."""
+        try:
+            connection = self.connection()
+            connection.execute(
+                'INSERT INTO positions (version, key, move, score, depth, updated) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(version, key) DO UPDATE SET move = excluded.move, score = excluded.score, '
+                'depth = excluded.depth, updated = excluded.updated WHERE excluded.depth > positions.depth',
+                (self.version, _signed(key), move.uci(), int(score), depth, time.time()))
+            self.writes += 1
+            if self.writes % EVICTION_INTERVAL == 0:
+                self.evict(connection)
+        except sqlite3.Error:
+            # Con la base ocupada o bloqueada simplemente no se guarda
+            pass
+
+    def evict(self, connection):
+        excess = connection.execute('SELECT COUNT(*) FROM positions').fetchone()[0] - self.max_entries
+        if excess > 0:
+            connection.execute(
+                'DELETE FROM positions WHERE rowid IN (SELECT rowid FROM positions ORDER BY updated LIMIT ?)',
+                (excess,))
+
+    def __len__(self):
+        return self.connection().execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+
+
+def open_position_cache(path, max_entries=100_000, version=''):
+    """Abre la caché de ``path`` o devuelve None si ``path`` está vacío."""
+    if not path:
+        return None
+    return PositionCache(path, max_entries, version)
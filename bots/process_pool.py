@@ -0,0 +1,43 @@
+# bots/process_pool.py
+"""
+Pools de procesos con estado propio en cada proceso.
+
+Cada proceso del pool construye su estado una sola vez al arrancar
+(``factory(*args)``, p. ej. un bot con su tabla de transposición) y las
+tareas lo recogen con ``worker_state()``, así se reutiliza de una tarea a la
+siguiente. ``factory`` y ``args`` viajan al proceso: deben poder serializarse.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+# Pools compartidos, por (factory, procesos, clave)
+_executors = {}
+
+# Estado del proceso del pool (``factory(*args)``)
+_state = None
+
+
+def process_pool(workers, factory, *args):
+    """Pool nuevo de ``workers`` procesos; quien lo crea lo cierra."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(factory, args))
+
+
+def shared_pool(workers, factory, *args, key=None):
+    """
+    Pool que dura lo que el proceso, compartido por quien pida el mismo
+    ``factory``, ``workers`` y ``key`` (por defecto ``args``).
+    """
+    key = (factory, workers, args if key is None else key)
+    executor = _executors.get(key)
+    if executor is None:
+        executor = process_pool(workers, factory, *args)
+        _executors[key] = executor
+    return executor
+
+
+def worker_state():
+    return _state
+
+
+def _init_worker(factory, args):
+    global _state
+    _state = factory(*args)
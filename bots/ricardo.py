@@ -1,13 +1,97 @@
 from .base_bot import BaseBot
+from .search_board import SearchBoard, insufficient_material
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+from .evaluation import ricardo_psqt, psqt_score, center_control, doubled_pawns, open_files
+from . import batch_eval
+from .move_cache import MoveCache
+from .move_ordering import MoveOrderer
+from .opening_book import load_book, STATIC_DIR
+from .process_pool import shared_pool, worker_state
+from .stats import SearchStats
+from .time_manager import SearchTimeout, allocate, depth_limit, node_limit
+from .tablebase import Tablebase, WIN, LOSS
 import chess
-import random
+import chess.polyglot
+import concurrent.futures
+import hashlib
+import itertools
+import math
+import multiprocessing
+import os
 import time
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed, ProcessPoolExecutor
-from collections import defaultdict, OrderedDict
+
+MATE_SCORE = 20000
+INFINITY = 1_000_000
+# Victoria según las tablas de finales: por debajo de cualquier mate
+TB_WIN = MATE_SCORE - 1000
+# Los mates valen MATE_SCORE menos los plies hasta el mate (el más rápido es
+# el mejor); por encima de MATE_BOUND un valor es un mate
+MATE_BOUND = MATE_SCORE - 500
+# Mates y victorias de las tablas dependen del ply: en la tabla de
+# transposición se guardan relativos al nodo (``score_to_tt``)
+WIN_BOUND = TB_WIN - 500
+# Margen de la poda delta en la quiescencia (términos posicionales)
+DELTA_MARGIN = 200
+
+# Módulos que deciden las jugadas y los valores de Ricardo: su huella es la
+# versión del motor en la caché de posiciones
+ENGINE_SOURCES = ('ricardo.py', 'evaluation.py', 'batch_eval.py', 'search_board.py', 'move_cache.py',
+                  'move_ordering.py', 'transposition.py', 'tablebase.py')
+
+# Repartos de la raíz abandonados a la vez que se pueden señalar a los procesos
+# del pool (ver ``_cancel_slots``) y cada cuánto se mira ``stop_event`` mientras
+# se espera a uno de ellos
+CANCEL_SLOTS = 64
+STOP_POLL_INTERVAL = 0.05
+
+# Búsqueda selectiva (cada técnica se activa o desactiva en RicardoBot)
+SEARCH_FEATURES = ('null_move', 'late_move_reductions', 'check_extensions', 'futility_pruning', 'razoring')
+# Movimiento nulo: reducción base (crece con la profundidad) y profundidad mínima
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+# Reducciones tardías: a partir de qué jugada y profundidad, y tabla por
+# profundidad y número de jugada en el orden
+LMR_MIN_DEPTH = 3
+LMR_MIN_INDEX = 3
+LMR_REDUCTIONS = [[0] * 64] + [
+    [0] + [int(0.75 + math.log(depth) * math.log(index) / 2.25) for index in range(1, 64)]
+    for depth in range(1, 64)
+]
+# Márgenes de la poda de futilidad y del razoring por profundidad restante
+FUTILITY_MARGINS = (0, 200, 500)
+RAZOR_MARGINS = (0, 350)
+
+
+def score_to_tt(score, ply):
+    if score >= WIN_BOUND:
+        return score + ply
+    if score <= -WIN_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score >= WIN_BOUND:
+        return score - ply
+    if score <= -WIN_BOUND:
+        return score + ply
+    return score
+
+
+def engine_version():
+    digest = hashlib.sha1()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in ENGINE_SOURCES:
+        with open(os.path.join(directory, name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+ENGINE_VERSION = engine_version()
+
 
 class RicardoBot(BaseBot):
-    def __init__(self):
+    def __init__(self, hash_size=1 << 20, workers=1, game_hash_size=1 << 16, tablebase=None, position_cache=None):
         super().__init__("Ricardo",2000)
         self.piece_values = {
             chess.PAWN: 100,
@@ -17,325 +101,669 @@ class RicardoBot(BaseBot):
             chess.QUEEN: 900,
             chess.KING: 20000
         }
-        self.transposition_table = LimitedSizeDict(max_size=1_000_000)
-        self.opening_book = self.load_opening_book('../static/openings.json')
-
-    def load_opening_book(self, file_path='../static/openings.json'):
-        if file_path:
-            try:
-                with open(file_path, "r") as file:
-                    openings = json.load(file)
-                    return {pos: [chess.Move.from_uci(move) for move in moves] for pos, moves in openings.items()}
-            except (FileNotFoundError, json.JSONDecodeError):
-                print("Error al cargar el libro de aperturas. Usando valores predeterminados.")
-
-        # Aperturas por defecto
-            return {
-        # Inicio del juego - Múltiples primeras jugadas posibles
-        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1": [
-            chess.Move.from_uci("e2e4"),  # Apertura clásica
-            chess.Move.from_uci("d2d4"),  # Gambito de Dama
-            chess.Move.from_uci("c2c4"),  # Inglesa
-            chess.Move.from_uci("g1f3"),  # Reti
-            chess.Move.from_uci("b2b3"),  # Larsen
-        ],
-
-        # Respuestas a 1.e4 (Defensas populares)
-        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1": [
-            chess.Move.from_uci("e7e5"),  # Defensa Abierta
-            chess.Move.from_uci("c7c5"),  # Defensa Siciliana
-            chess.Move.from_uci("e7e6"),  # Defensa Francesa
-            chess.Move.from_uci("c7c6"),  # Caro-Kann
-            chess.Move.from_uci("g8f6"),  # Defensa Alekhine
-            chess.Move.from_uci("d7d6"),  # Defensa Pirc
-        ],
-
-        # Respuestas a 1.d4 (Defensas principales)
-        "rnbqkbnr/pppppppp/8/8/3PP3/8/PPP2PPP/RNBQKBNR b KQkq - 0 1": [
-            chess.Move.from_uci("d7d5"),  # Defensa Ortodoxa
-            chess.Move.from_uci("g8f6"),  # Defensa India de Rey
-            chess.Move.from_uci("e7e6"),  # Defensa Francesa (transposición)
-            chess.Move.from_uci("c7c5"),  # Defensa Benoni
-            chess.Move.from_uci("f7f5"),  # Defensa Holandesa
-        ],
-
-        # Respuestas a 1.c4 (Apertura Inglesa)
-        "rnbqkbnr/pppppppp/8/8/2P5/8/PP1PPPPP/RNBQKBNR b KQkq - 0 1": [
-            chess.Move.from_uci("e7e5"),  # Variante Reversa de la Siciliana
-            chess.Move.from_uci("c7c5"),  # Defensa Siciliana Inversa
-            chess.Move.from_uci("g8f6"),  # Defensa India
-            chess.Move.from_uci("e7e6"),  # Sistema Botvinnik
-            chess.Move.from_uci("c7c6"),  # Defensa Caro-Kann (posible transposición)
-        ],
-
-        # Respuestas a 1.Nf3 (Apertura Reti)
-        "rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R b KQkq - 0 1": [
-            chess.Move.from_uci("d7d5"),  # Variante Clásica
-            chess.Move.from_uci("g8f6"),  # India de Rey
-            chess.Move.from_uci("c7c5"),  # Defensa Siciliana Inversa
-            chess.Move.from_uci("e7e6"),  # Defensa Francesa
-            chess.Move.from_uci("c7c6"),  # Defensa Caro-Kann
-        ],
-
-        # Después de 1.e4 e5 2.Nf3 (Posibilidades negras)
-        "rnbqkbnr/pppppppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 0 2": [
-            chess.Move.from_uci("b8c6"),  # Defensa Española
-            chess.Move.from_uci("g8f6"),  # Defensa Petrov
-            chess.Move.from_uci("d7d6"),  # Defensa Philidor
-            chess.Move.from_uci("f7f5"),  # Defensa Letona
-            chess.Move.from_uci("c7c6"),  # Variante Caro-Kann
-        ]
-    }
-
-    def get_move(self, board):
+        self.psqt = ricardo_psqt(self.piece_values)
+        self.psqt_array = None  # Para evaluate_batch, se crea al usarla
+        self.transposition_table = TranspositionTable(hash_size)
+        self.move_orderer = MoveOrderer(self.piece_values)
+        # Jugadas legales por posición, compartidas por evaluación, fin de partida y ordenación
+        self.move_cache = MoveCache()
+        self.time_budget = 3.0  # Segundos por jugada cuando la partida no tiene reloj
+        self.max_depth = 7  # Profundidad inicial ajustada
+        self.aspiration_window = 50
+        # Técnicas de búsqueda selectiva (ver SEARCH_FEATURES)
+        self.null_move = True
+        self.late_move_reductions = True
+        self.check_extensions = True
+        self.futility_pruning = True
+        # Con esta evaluación el razoring retrasa los mates con jugada tranquila
+        # (p. ej. wac-001) y apenas ahorra nodos: disponible, pero apagado
+        self.razoring = False
+        self.root_depth = 0
+        # Con más de un proceso se reparten las jugadas raíz entre núcleos
+        self.hash_size = hash_size
+        self.workers = workers
+        self.game_hash_size = game_hash_size
+        self.stop_event = None
+        self.on_info = None
+        self.node_limit = float('inf')
+        # Identifica la búsqueda ante los procesos del pool (``_search_root_move``)
+        self.search_id = 0
+        # Tablas Syzygy compartidas (opcionales) para finales con pocas piezas
+        self.tablebase = tablebase
+        # Caché en disco de búsquedas raíz (opcional), compartida entre procesos;
+        # se consulta pidiendo como mucho ``cache_depth`` de profundidad
+        self.position_cache = position_cache
+        self.cache_depth = 5
+        self.root_move = None
+        self.root_score = 0
+        self.nodes_evaluated = 0
+        self.qnodes = 0
+        self.cutoffs = 0
+        self.tb_hits = 0
+        self.completed_depth = 0
+        self.set_node_counters(self.node_counters)
+        self.opening_book = self.load_opening_book()
+
+    def set_node_counters(self, enabled):
+        super().set_node_counters(enabled)
+        self.transposition_table.set_counters(enabled)
+        # Como en la tabla, sin contadores se llama a la quiescencia sin envoltorio
+        if enabled:
+            self.quiescence_search = self.counted_quiescence_search
+        else:
+            self.__dict__.pop('quiescence_search', None)
+
+    def load_opening_book(self, file_path=None):
+        # El .bin compilado se mapea en memoria; el JSON queda como respaldo
+        if file_path is None:
+            file_path = os.path.join(STATIC_DIR, 'openings.bin')
+            if not os.path.exists(file_path):
+                file_path = os.path.join(STATIC_DIR, 'openings.json')
+        return load_book(file_path)
+
+    def get_move(self, board, limit=None, stop_event=None, on_info=None):
+        stats = SearchStats()
         # Intenta obtener un movimiento de la lista de aperturas
         opening_move = self.get_opening_move(board)
         if opening_move:
+            stats.book = True
+            self.report_stats(stats)
             return opening_move
+
+        # En un final cubierto por las tablas la jugada es inmediata
+        if self.tablebase is not None:
+            tablebase_move = self.tablebase.root_move(board)
+            if tablebase_move is not None:
+                stats.tablebase = True
+                self.report_stats(stats)
+                return tablebase_move
         
-        # Si no hay movimientos de apertura disponibles, usa el minimax
+        # Si no hay movimientos de apertura disponibles, usa la búsqueda.
+        # Un SearchTimeout deja jugadas sin deshacer en la copia, no en ``board``
+        search_board = SearchBoard.from_board(board, psqt=self.psqt)
+        max_depth = depth_limit(limit, self.max_depth)
+
+        # Una búsqueda igual o más profunda de la misma posición ya guardada
+        cache = self.position_cache if self.cacheable(board) else None
+        if cache is not None:
+            cached = cache.get(search_board.zobrist, min(max_depth, self.cache_depth))
+            if cached is not None and board.is_legal(cached[0]):
+                stats.cached = True
+                stats.depth = cached[2]
+                stats.score = cached[1]
+                self.report_stats(stats)
+                return cached[0]
+
+        table = self.transposition_table
+        table.new_search()
+        self.move_orderer.new_search()
+        self.search_id = next(_search_ids)
         self.nodes_evaluated = 0
-        start_time = time.time()
-        max_depth = 7  # Profundidad inicial ajustada
-        
-        best_move = self.iterative_deepening(board, max_depth, start_time)
+        self.qnodes = 0
+        self.cutoffs = 0
+        self.tb_hits = 0
+        self.completed_depth = 0
+        probes, hits = table.probes, table.hits
+        # Límites por jugada según el reloj, calculados antes de empezar a buscar
+        budget = allocate(board, limit, self.time_budget)
+        self.deadline = budget.hard
+        self.soft_deadline = budget.soft
+        self.node_limit = node_limit(limit)
+        # Cancelación cooperativa y progreso por iteración (trabajos en segundo plano)
+        self.stop_event = stop_event
+        self.on_info = on_info
+
+        best_move = self.iterative_deepening(search_board, max_depth)
+        # Solo se guardan iteraciones completas de búsquedas no canceladas
+        if cache is not None and self.root_move is not None and not self.stopped():
+            cache.put(search_board.zobrist, self.root_move, self.root_score, self.completed_depth)
+
+        stats.depth = self.completed_depth
+        if self.root_move is not None:
+            stats.score = self.root_score
+        stats.nodes = self.nodes_evaluated
+        stats.qnodes = self.qnodes
+        stats.cutoffs = self.cutoffs
+        stats.tb_hits = self.tb_hits
+        stats.tt_probes = table.probes - probes
+        stats.tt_hits = table.hits - hits
+        self.report_stats(stats)
         return best_move or list(board.legal_moves)[0]
 
+    def new_game(self):
+        # El libro y el pool de procesos se comparten; la tabla y el
+        # historial de la búsqueda son propios de la partida
+        bot = super().new_game()
+        bot.transposition_table = TranspositionTable(self.game_hash_size)
+        bot.move_orderer = MoveOrderer(self.piece_values)
+        bot.move_cache = MoveCache(self.move_cache.size)
+        # Los métodos con contadores de la copia siguen ligados al original
+        bot.set_node_counters(self.node_counters)
+        return bot
+
+    def ponder_move(self, board):
+        # Segunda jugada de la variante principal: la mejor de la tabla tras la nuestra
+        move = self.transposition_table.best_move(chess.polyglot.zobrist_hash(board))
+        return move if move is not None and board.is_legal(move) else None
+
+    def search_features(self):
+        return {feature: getattr(self, feature) for feature in SEARCH_FEATURES}
+
+    def worker_args(self):
+        # Dentro de otro proceso la búsqueda no se vuelve a repartir
+        return {'hash_size': self.hash_size, 'tablebase': self.tablebase, 'position_cache': self.position_cache}
+
+    @staticmethod
+    def cacheable(board):
+        # La clave Zobrist no recoge el historial: cerca de una repetición o de
+        # la regla de los 50 movimientos la jugada guardada puede no valer
+        return board.halfmove_clock < 80 and not board.is_repetition(2)
+
     def get_opening_move(self, board):
-        fen = board.fen()
-        return self.opening_book.get(fen, None)
+        return self.opening_book.weighted_choice(board)
+
+    def iterative_deepening(self, board, max_depth):
+        """
+        Profundización iterativa con ventanas de aspiración.
 
-    def iterative_deepening(self, board, max_depth, start_time):
-        best_move = None
+        Devuelve la jugada de la última iteración completa o, si el tiempo se
+        agota a mitad de una iteración, la mejor jugada raíz que esa iteración
+        ya había demostrado mejor que la anterior.
+        """
+        start_time = time.time()
+        best_move, best_score = None, 0
+        self.root_move, self.root_score = None, 0
+        # La búsqueda anterior de la partida puede haber dejado la jugada PV
+        self.pv_move = self.transposition_table.best_move(board.zobrist)
         for depth in range(1, max_depth + 1):
-            if time.time() - start_time > self.think_time():
+            self.root_best = None
+            try:
+                best_score, best_move = self.aspiration_search(board, depth, best_score)
+            except SearchTimeout:
+                if self.root_best is not None:
+                    best_move = self.root_best
+                break
+            self.pv_move = best_move
+            self.completed_depth = depth
+            self.root_move, self.root_score = best_move, best_score
+            if self.on_info is not None:
+                self.report_iteration(board, depth, best_score, start_time)
+            if abs(best_score) >= MATE_BOUND:
+                break
+            # Una iteración más suele costar más que todas las anteriores juntas
+            if time.time() > self.soft_deadline:
                 break
-            value, move = self.minimax(board, depth, float('-inf'), float('inf'), True, start_time)
-            if move:
-                best_move = move
         return best_move
 
-    def minimax(self, board, depth, alpha, beta, maximizing, start_time):
-        best_move = None 
-        if time.time() - start_time > self.think_time():
-            return None, None
-
-        board_hash = hash(str(board))
-        if board_hash in self.transposition_table and self.transposition_table[board_hash][0] >= depth:
-            return self.transposition_table[board_hash][1], self.transposition_table[board_hash][2]
-
-        if depth == 0 or board.is_game_over():
-            evaluation = self.quiescence_search(board, alpha, beta)
-            self.transposition_table[board_hash] = (depth, evaluation, best_move or None)  # Almacenar evaluación sin movimiento
-            return evaluation, None
-        
-        # Manejar caso sin movimientos legales
-        if not list(board.legal_moves):
-            return self.evaluate_position(board), None
-
-        if maximizing:
-            max_eval = float('-inf')
-            for move in self.order_moves(board):
-                board.push(move)
-                eval, _ = self.minimax(board, depth - 1, alpha, beta, False, start_time)
-                board.pop()
-
-                if eval is None:  # Tiempo agotado
-                    return None, None
-
-                if eval > max_eval:
-                    max_eval = eval
-                    best_move = move
-                alpha = max(alpha, eval)
-                if beta <= alpha:
+    def aspiration_search(self, board, depth, guess):
+        if depth < 3:
+            return self.search_root(board, depth, -INFINITY, INFINITY)
+        delta = self.aspiration_window
+        alpha, beta = guess - delta, guess + delta
+        while True:
+            score, move = self.search_root(board, depth, alpha, beta)
+            if score <= alpha and alpha > -INFINITY:
+                alpha = max(-INFINITY, alpha - delta)
+            elif score >= beta and beta < INFINITY:
+                beta = min(INFINITY, beta + delta)
+            else:
+                return score, move
+            delta *= 4
+
+    def search_root(self, board, depth, alpha, beta):
+        """Nodo raíz de la búsqueda de variante principal (PVS)."""
+        self.root_depth = depth
+        if self.workers > 1 and depth > 1:
+            return self.parallel_search_root(board, depth, alpha, beta)
+        alpha_orig = alpha
+        best_score, best_move = -INFINITY, None
+        legal_moves = self.move_cache.legal_moves(board)
+        for index, move in enumerate(self.move_orderer.moves(board, self.pv_move, 0, legal_moves)):
+            board.push(move)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            else:
+                score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, 1)
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            board.pop()
+
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+                self.root_best = move
+                if alpha >= beta:
                     break
-            self.transposition_table[board_hash] = (depth, max_eval, best_move)
-            return max_eval, best_move
-        else:
-            min_eval = float('inf')
-            for move in self.order_moves(board):
-                board.push(move)
-                eval, _ = self.minimax(board, depth - 1, alpha, beta, True, start_time)
-                board.pop()
-
-                if eval is None:  # Tiempo agotado
-                    return None, None
+        self.transposition_table.store(board.zobrist, depth, self.bound_flag(best_score, alpha_orig, beta), best_score, best_move)
+        return best_score, best_move
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        """
+        Búsqueda negamax con ventana nula para las jugadas que no son PV.
+
+        Es selectiva: extiende los jaques, poda con el movimiento nulo, la
+        futilidad y el razoring en los nodos que no son PV y reduce las
+        jugadas tranquilas tardías (LMR), volviendo a buscarlas a la
+        profundidad completa si superan alpha.
+        """
+        self.check_time()
+
+        # Tablas sin generar jugadas: 50 movimientos, material insuficiente y
+        # repetición (también de posiciones de la partida anteriores a la búsqueda)
+        if board.is_draw():
+            return 0
 
-                if eval < min_eval:
-                    min_eval = eval
-                    best_move = move
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            self.transposition_table[board_hash] = (depth, min_eval, best_move)
-            return min_eval, best_move
+        # Extensión de jaque, acotada para que una serie de jaques no crezca sin fin
+        in_check = board.is_check()
+        if in_check and self.check_extensions and ply <= 2 * self.root_depth:
+            depth += 1
+
+        # Consultar la tabla de transposición respetando el tipo de cota
+        board_hash = board.zobrist
+        tt_move = None
+        entry = self.transposition_table.probe(board_hash)
+        if entry is not None:
+            entry_depth, flag, value, tt_move = entry
+            value = score_from_tt(value, ply)
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+
+        # Tras una captura o jugada de peón (reloj de 50 a cero), un final
+        # cubierto por las tablas tiene valor exacto sin buscar
+        tablebase = self.tablebase
+        if tablebase is not None and not board.halfmove_clock and chess.popcount(board.occupied) <= tablebase.max_pieces:
+            wdl = tablebase.probe_wdl(board)
+            if wdl is not None:
+                self.tb_hits += 1
+                if wdl == WIN:
+                    return TB_WIN - ply
+                if wdl == LOSS:
+                    return -TB_WIN + ply
+                return 0  # Victorias y derrotas "malditas" son tablas por la regla de los 50
+
+        if depth <= 0:
+            return self.quiescence_search(board, alpha, beta, ply)
+
+        # Poda en nodos que no son PV, lejos de los valores de mate
+        futile = False
+        if beta - alpha == 1 and not in_check and abs(beta) < TB_WIN:
+            static_eval = self.evaluate_position(board)
+
+            # Razoring: muy por debajo de alpha cerca de las hojas, basta la quiescencia
+            if self.razoring and depth < len(RAZOR_MARGINS) and static_eval + RAZOR_MARGINS[depth] < alpha:
+                score = self.quiescence_search(board, alpha - 1, alpha, ply)
+                if score < alpha:
+                    return score
+
+            # Movimiento nulo: si pasando el turno aún se supera beta, cortar.
+            # Contra el zugzwang: nunca dos seguidos ni solo con rey y peones
+            if (self.null_move and depth >= NULL_MOVE_MIN_DEPTH and static_eval >= beta
+                    and board.move_stack and board.move_stack[-1]
+                    and board.occupied_co[board.turn] & ~(board.pawns | board.kings)):
+                reduction = NULL_MOVE_REDUCTION + depth // 4
+                board.push(chess.Move.null())
+                score = -self.negamax(board, depth - 1 - reduction, -beta, -beta + 1, ply + 1)
+                board.pop()
+                if score >= beta:
+                    return beta
 
-    def quiescence_search(self, board, alpha, beta):
+            # Futilidad: las jugadas tranquilas no llegan a alpha
+            futile = self.futility_pruning and depth < len(FUTILITY_MARGINS) and static_eval + FUTILITY_MARGINS[depth] <= alpha
+
+        killers = self.move_orderer.killer_moves(ply)
+        reduce_late = self.late_move_reductions and depth >= LMR_MIN_DEPTH and not in_check
+        alpha_orig = alpha
+        best_score, best_move = -INFINITY, None
+        # Las jugadas se generan por etapas salvo que la evaluación ya las tenga
+        for index, move in enumerate(self.move_orderer.moves(board, tt_move, ply, self.move_cache.cached(board))):
+            quiet = index > 0 and not move.promotion and not board.is_capture(move)
+            board.push(move)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                reduction = 0
+                if quiet and not board.is_check():
+                    if futile:
+                        board.pop()
+                        continue
+                    if reduce_late and index >= LMR_MIN_INDEX and move not in killers:
+                        reduction = min(LMR_REDUCTIONS[min(depth, 63)][min(index, 63)], depth - 2)
+                score = -self.negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
+                if reduction and score > alpha:
+                    score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.pop()
+
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs += 1
+                        self.move_orderer.record_cutoff(board, move, depth, ply)
+                        break
+        if best_move is None:
+            # Sin jugadas legales: mate (cuanto más cerca, peor) o ahogado
+            return -MATE_SCORE + ply if in_check else 0
+        self.transposition_table.store(board_hash, depth, self.bound_flag(best_score, alpha_orig, beta),
+                                       score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def check_time(self):
+        # Consultar el reloj cada pocos nodos para no pagar time.time() siempre
+        self.nodes_evaluated += 1
+        if not self.nodes_evaluated & 1023 and (time.time() > self.deadline or self.nodes_evaluated > self.node_limit
+                                                or self.stopped()):
+            raise SearchTimeout()
+
+    def stopped(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def report_iteration(self, board, depth, score, start_time):
+        elapsed = time.time() - start_time
+        pv = self.principal_variation(board, depth)
+        self.on_info({
+            'depth': depth,
+            'score': score,
+            'move': pv[0].uci() if pv else None,
+            'pv': [move.uci() for move in pv],
+            'nodes': self.nodes_evaluated,
+            'time': round(elapsed, 3),
+            'nps': int(self.nodes_evaluated / elapsed) if elapsed > 0 else 0,
+        })
+
+    def principal_variation(self, board, max_length=16):
+        """Reconstruye la variante principal siguiendo las jugadas de la tabla."""
+        pv = []
+        seen = set()
+        while len(pv) < max_length and board.zobrist not in seen:
+            seen.add(board.zobrist)
+            move = self.transposition_table.best_move(board.zobrist)
+            if move is None or not board.is_legal(move):
+                break
+            pv.append(move)
+            board.push(move)
+        for _ in pv:
+            board.pop()
+        return pv
+
+    @staticmethod
+    def bound_flag(value, alpha, beta):
+        """Clasifica un valor según la ventana original (alpha, beta)."""
+        if value <= alpha:
+            return UPPER
+        if value >= beta:
+            return LOWER
+        return EXACT
+
+    def counted_quiescence_search(self, board, alpha, beta, ply):
+        self.qnodes += 1
+        return RicardoBot.quiescence_search(self, board, alpha, beta, ply)
+
+    def quiescence_search(self, board, alpha, beta, ply):
+        self.check_time()
         stand_pat = self.evaluate_position(board)
+        if stand_pat == -MATE_SCORE:
+            return -MATE_SCORE + ply  # Mate: no hay capturas que mirar
         if stand_pat >= beta:
             return beta
+        # Poda delta: ni ganando una dama se llega a alpha (salvo que pueda coronar)
+        promoting = board.pawns & board.occupied_co[board.turn] & (chess.BB_RANK_7 if board.turn else chess.BB_RANK_2)
+        if not promoting and stand_pat + self.piece_values[chess.QUEEN] + DELTA_MARGIN < alpha:
+            return alpha
         if alpha < stand_pat:
             alpha = stand_pat
-        for move in board.legal_moves:
-            if board.is_capture(move):
-                board.push(move)
-                score = -self.quiescence_search(board, -beta, -alpha)
-                board.pop()
-                if score >= beta:
-                    return beta
-                if score > alpha:
-                    alpha = score
+
+        orderer = self.move_orderer
+        # La evaluación ya ha generado (y guardado) las jugadas de la posición
+        captures = sorted([move for move in self.move_cache.legal_moves(board) if board.is_capture(move)],
+                          key=lambda move: orderer.capture_score(board, move), reverse=True)
+        for move in captures:
+            if not move.promotion:
+                # La víctima no basta para superar alpha
+                victim = board.piece_type_at(move.to_square) or chess.PAWN
+                if stand_pat + orderer.piece_values[victim] + DELTA_MARGIN <= alpha:
+                    continue
+                # La captura pierde material en el intercambio
+                if orderer.losing_capture(board, move):
+                    continue
+            board.push(move)
+            score = -self.quiescence_search(board, -beta, -alpha, ply + 1)
+            board.pop()
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
         return alpha
 
     def evaluate_position(self, board):
-        if board.is_checkmate():
-            return -20000 if board.turn else 20000
-        if board.is_stalemate() or board.is_insufficient_material():
+        # Una sola generación de jugadas sirve para el mate, el ahogado, la
+        # movilidad y luego la ordenación (ver ``MoveCache``)
+        legal_moves = len(self.move_cache.legal_moves(board))
+        if not legal_moves:
+            return -MATE_SCORE if board.is_check() else 0  # Valor relativo al bando que mueve
+        if insufficient_material(board):
             return 0
 
-        score = 0
-
-        # Evaluar material
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                value = self.piece_values[piece.piece_type]
-                
-                # Bonificaciones posicionales
-                if piece.piece_type == chess.PAWN:
-                    rank = chess.square_rank(square)
-                    if piece.color == chess.WHITE:
-                        value += rank * 10  # Peones avanzados valen más
-                    else:
-                        value += (7 - rank) * 10  # Peones negros avanzados valen más
-                
-                # Centralidad
-                file = chess.square_file(square)
-                rank = chess.square_rank(square)
-                distance_to_center = abs(3.5 - file) + abs(3.5 - rank)
-                value += (7 - distance_to_center) * 5  # Piezas centrales valen más
-
-                score += value if piece.color == chess.WHITE else -value
+        # Material, avance de peones y centralidad (incremental en SearchBoard)
+        score = psqt_score(board, self.psqt)
 
-        # Control del centro
-        central_squares = [chess.D4, chess.E4, chess.D5, chess.E5]
-        for square in central_squares:
-            if board.is_attacked_by(chess.WHITE, square):
-                score += 10
-            if board.is_attacked_by(chess.BLACK, square):
-                score -= 10
+        # Control del centro, seguridad del rey y movilidad
+        score += self.activity_score(board, legal_moves)
 
-        # Seguridad del rey
-        king_square = board.king(chess.WHITE)
-        if king_square:
-            score += len(board.attackers(chess.WHITE, king_square)) * 5
-            score -= len(board.attackers(chess.BLACK, king_square)) * 5
-
-        king_square = board.king(chess.BLACK)
-        if king_square:
-            score -= len(board.attackers(chess.WHITE, king_square)) * 5
-            score += len(board.attackers(chess.BLACK, king_square)) * 5
-
-        # Movilidad
-        score += len(list(board.legal_moves)) * 5 if board.turn == chess.WHITE else -len(list(board.legal_moves)) * 5
+        white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
 
         # Penaliazción --
         # Penalizar peones doblados
-        for color in [chess.WHITE, chess.BLACK]:
-            doubled_pawns = 0
-            for file in range(8):
-                pawns_in_file = len([pawn for pawn in board.pieces(chess.PAWN, color) if chess.square_file(pawn) == file])
-                if pawns_in_file > 1:
-                    doubled_pawns += pawns_in_file - 1
-            score += (-doubled_pawns * 50) if color == chess.WHITE else (doubled_pawns * 50)
+        score -= doubled_pawns(board.pawns & white) * 50
+        score += doubled_pawns(board.pawns & black) * 50
         
         # Bonificación ++
         # Control de columnas abiertas con las torres
-
-        for color in [chess.WHITE, chess.BLACK]:
-            for file in range(8):
-                if not any(board.piece_at(chess.square(rank, file)) for rank in range(8)):
-                    rooks = board.pieces(chess.ROOK, color)
-                    for rook in rooks:
-                        if chess.square_file(rook) == file:
-                            score += 30 if color == chess.WHITE else -30
+        open_mask = open_files(board.occupied)
+        score += chess.popcount(board.rooks & white & open_mask) * 30
+        score -= chess.popcount(board.rooks & black & open_mask) * 30
 
          # Desarrollo de piezas
-        developed_pieces = len([piece for piece in board.piece_map().values() if piece.piece_type in [chess.KNIGHT, chess.BISHOP]])
+        developed_pieces = chess.popcount(board.knights | board.bishops)
         score += developed_pieces * 20 if board.turn == chess.WHITE else -developed_pieces * 20
 
         return score if board.turn else -score
 
-    def score_move(self, board, move):
-        score = 0
-        
-        # Capturas tácticas
-        if board.is_capture(move):
-            capturing_piece = board.piece_at(move.from_square)
-            captured_piece = board.piece_at(move.to_square)
-            if captured_piece:
-                score += 10000 + self.piece_values[captured_piece.piece_type] - (self.piece_values[capturing_piece.piece_type] / 10)
-        
-        # Promociones
-        if move.promotion:
-            score += 9000 + self.piece_values[move.promotion]
-        
-        # Centralidad
-        to_rank, to_file = chess.square_rank(move.to_square), chess.square_file(move.to_square)
-        center_distance = abs(3.5 - to_rank) + abs(3.5 - to_file)
-        score += (4 - center_distance) * 10
-        
-        # Movimientos que dan jaque
-        board.push(move)
-        if board.is_check():
-            score += 500
-        board.pop()
-        
-        return score
-    
-    def has_immediate_threat(self, board):
-        for move in board.legal_moves:
-            if board.gives_check(move) or board.is_capture(move):
-                return True
-        return False
-
-    def order_moves(self, board):
-        scored_moves = []
-        for move in board.legal_moves:
-            score = self.score_move(board, move)
-            scored_moves.append((score, move))
-        
-        scored_moves.sort(reverse=True, key=lambda x: x[0])
-        return [move for score, move in scored_moves]
-
-    def parallel_minimax(self, board, depth, alpha, beta, maximizing, start_time):
-        with ThreadPoolExecutor(max_workers=4) as executor:  # Ajusta el número de hilos según tu CPU
-            futures = []
-            for move in self.order_moves(board):
-                board.push(move)
-                futures.append(executor.submit(self.minimax, board.copy(), depth - 1, alpha, beta, not maximizing, start_time))
-                board.pop()
-            
-            best_move = None
-            best_value = float('-inf') if maximizing else float('inf')
-            for future in as_completed(futures):
-                eval, move = future.result()
-                if eval is None:
+    def activity_score(self, board, legal_moves):
+        """Términos que necesitan ataques o jugadas (positivo para las blancas)."""
+        # Control del centro
+        score = center_control(board)
+
+        # Seguridad del rey
+        king_square = board.king(chess.WHITE)
+        if king_square:
+            score += chess.popcount(board.attackers_mask(chess.WHITE, king_square)) * 5
+            score -= chess.popcount(board.attackers_mask(chess.BLACK, king_square)) * 5
+
+        king_square = board.king(chess.BLACK)
+        if king_square:
+            score -= chess.popcount(board.attackers_mask(chess.WHITE, king_square)) * 5
+            score += chess.popcount(board.attackers_mask(chess.BLACK, king_square)) * 5
+
+        # Movilidad
+        mobility = legal_moves * 5
+        return score + mobility if board.turn == chess.WHITE else score - mobility
+
+    def evaluate_batch(self, boards):
+        """
+        Evalúa un lote de posiciones con el mismo resultado que
+        ``evaluate_position``. Con NumPy, material, tablas pieza-casilla,
+        peones doblados, columnas abiertas y desarrollo se calculan para todo
+        el lote a la vez (``bots.batch_eval``); el resto, posición a posición.
+        """
+        if self.psqt_array is None:
+            self.psqt_array = batch_eval.table_array(self.psqt)
+        if self.psqt_array is None or not boards:
+            return [self.evaluate_position(board) for board in boards]
+        pieces, colors, turn, _ = batch_eval.BoardBatch(boards).arrays()
+        black, white = colors[:, 0], colors[:, 1]
+        pawns, rooks = pieces[:, 0], pieces[:, 3]
+        scores = batch_eval.psqt_scores(pieces, colors, self.psqt_array)
+        scores -= batch_eval.doubled_pawns(pawns & white) * 50
+        scores += batch_eval.doubled_pawns(pawns & black) * 50
+        open_mask = batch_eval.open_file_masks(white | black)
+        scores += batch_eval.popcount(rooks & white & open_mask) * 30
+        scores -= batch_eval.popcount(rooks & black & open_mask) * 30
+        developed_pieces = batch_eval.popcount(pieces[:, 1] | pieces[:, 2])
+        scores += developed_pieces * 20 * (2 * turn.astype(int) - 1)
+
+        results = []
+        for board, score in zip(boards, scores.tolist()):
+            legal_moves = len(self.move_cache.legal_moves(board))
+            if not legal_moves:
+                results.append(-MATE_SCORE if board.is_check() else 0)
+            elif insufficient_material(board):
+                results.append(0)
+            else:
+                score += self.activity_score(board, legal_moves)
+                results.append(score if board.turn else -score)
+        return results
+
+    def order_moves(self, board, first_move=None):
+        return list(self.move_orderer.moves(board, first_move, 0, self.move_cache.legal_moves(board)))
+
+    @property
+    def executor(self):
+        tablebase = self.tablebase.config() if self.tablebase is not None else None
+        hash_size = self.hash_size // self.workers
+        return shared_pool(self.workers, _worker_bot, hash_size, tablebase, _cancel_slots(), key=(hash_size, tablebase))
+
+    def parallel_search_root(self, board, depth, alpha, beta):
+        """
+        Reparte las jugadas raíz entre procesos (root splitting).
+
+        La primera jugada (la PV) se busca sola con la ventana completa para
+        fijar alpha; el resto se busca en paralelo con ventana nula y solo las
+        que la superan se vuelven a buscar con ventana abierta.
+        """
+        root_fen = board.root().fen()
+        history = [move.uci() for move in board.move_stack]
+        moves = self.order_moves(board, self.pv_move)
+        # Los procesos del pool consultan este reparto en ``_cancel_slots``
+        split_id = next(_search_ids)
+        submitted = []
+
+        def submit(move, low, high):
+            future = self.executor.submit(_search_root_move, root_fen, history, move.uci(), depth, low, high,
+                                          self.deadline, self.search_features(), self.search_id, split_id)
+            submitted.append(future)
+            return future
+
+        def collect(future):
+            while not self.stopped():
+                try:
+                    score, nodes = future.result(timeout=STOP_POLL_INTERVAL)
+                except concurrent.futures.TimeoutError:
                     continue
-                if maximizing and eval > best_value:
-                    best_value = eval
-                    best_move = move
-                elif not maximizing and eval < best_value:
-                    best_value = eval
-                    best_move = move
-            return best_value, best_move
-        
-class LimitedSizeDict(OrderedDict):
-    def __init__(self, *args, max_size=1000000, **kwargs):
-        self.max_size = max_size
-        super().__init__(*args, **kwargs)
-
-    def __setitem__(self, key, value):
-        super().__setitem__(key, value)
-        if len(self) > self.max_size:
-            self.popitem(last=False)
\ No newline at end of file
+                self.nodes_evaluated += nodes
+                if score is None:
+                    raise SearchTimeout()
+                return score
+            raise SearchTimeout()
+
+        alpha_orig = alpha
+        best_move = moves[0]
+        try:
+            best_score = collect(submit(best_move, alpha, beta))
+            if best_score > alpha:
+                alpha = best_score
+                self.root_best = best_move
+
+            if alpha < beta:
+                window = alpha
+                futures = [(move, submit(move, window, window + 1)) for move in moves[1:]]
+                for move, future in futures:
+                    score = collect(future)
+                    if score > window:
+                        # Solo es una cota inferior: repetir con la ventana actual
+                        if score < beta:
+                            score = collect(submit(move, alpha, beta))
+                        if score > best_score:
+                            best_score, best_move = score, move
+                        if score > alpha:
+                            alpha = score
+                            self.root_best = move
+                            if alpha >= beta:
+                                break
+        finally:
+            # Tras un corte, una parada o el fin del tiempo las jugadas sin
+            # empezar se descartan y las que están en marcha se paran
+            running = [future for future in submitted if not future.cancel() and not future.done()]
+            if running:
+                _cancel_slots()[split_id % CANCEL_SLOTS] = split_id
+        self.transposition_table.store(board.zobrist, depth, self.bound_flag(best_score, alpha_orig, beta), best_score, best_move)
+        return best_score, best_move
+
+
+# Búsquedas y repartos de la raíz de este proceso, para los procesos del pool
+_search_ids = itertools.count(1)
+
+# Repartos abandonados, compartidos con los procesos del pool: la ranura
+# ``id % CANCEL_SLOTS`` vale ``id`` cuando el reparto ``id`` se ha abandonado
+_cancelled = None
+
+
+def _cancel_slots():
+    global _cancelled
+    if _cancelled is None:
+        _cancelled = multiprocessing.Array('q', CANCEL_SLOTS, lock=False)
+    return _cancelled
+
+
+class _SplitStop:
+    """``stop_event`` de un bot del pool: se activa si abandonan su reparto."""
+
+    def __init__(self, cancelled, split_id):
+        self.cancelled = cancelled
+        self.split_id = split_id
+
+    def is_set(self):
+        return self.cancelled[self.split_id % CANCEL_SLOTS] == self.split_id
+
+
+def _worker_bot(hash_size, tablebase=None, cancelled=None):
+    # Bot propio de cada proceso del pool; su tabla de transposición sobrevive
+    # entre jugadas raíz e iteraciones. Cada proceso abre (y mapea) sus
+    # propias tablas de finales
+    global _cancelled
+    _cancelled = cancelled
+    return RicardoBot(hash_size=hash_size, tablebase=Tablebase(*tablebase) if tablebase else None)
+
+
+def _search_root_move(root_fen, history, move_uci, depth, alpha, beta, deadline, features, search_id, split_id):
+    """Busca una jugada raíz en un proceso del pool y devuelve (valor, nodos)."""
+    bot = worker_state()
+    # Como en ``get_move``: una búsqueda nueva envejece la tabla y olvida las
+    # asesinas; las jugadas raíz e iteraciones de la misma las comparten
+    if bot.search_id != search_id:
+        bot.search_id = search_id
+        bot.transposition_table.new_search()
+        bot.move_orderer.new_search()
+    for feature, enabled in features.items():
+        setattr(bot, feature, enabled)
+    bot.root_depth = depth
+    board = SearchBoard(root_fen, psqt=bot.psqt)
+    for uci in history:
+        board.push(chess.Move.from_uci(uci))
+    board.push(chess.Move.from_uci(move_uci))
+    bot.deadline = deadline
+    bot.stop_event = _SplitStop(_cancel_slots(), split_id)
+    bot.nodes_evaluated = 0
+    try:
+        score = -bot.negamax(board, depth - 1, -beta, -alpha, 1)
+    except SearchTimeout:
+        score = None
+    return score, bot.nodes_evaluated
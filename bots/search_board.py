@@ -0,0 +1,174 @@
+# bots/search_board.py
+import chess
+import chess.polyglot
+
+ZOBRIST = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+
+# Claves de enroque indexadas por la esquina de la torre (formato Polyglot)
+_CASTLING_KEYS = (
+    (chess.BB_H1, ZOBRIST[768]),
+    (chess.BB_A1, ZOBRIST[769]),
+    (chess.BB_H8, ZOBRIST[770]),
+    (chess.BB_A8, ZOBRIST[771]),
+)
+_castling_cache = {}
+
+# Tabla pieza-casilla neutra para quien solo necesita la clave Zobrist
+EMPTY_PSQT = (0,) * (12 * 64)
+
+
+def piece_index(piece_type, color):
+    """Índice Polyglot de una pieza: las negras son pares y las blancas impares."""
+    return (piece_type - 1) * 2 + (1 if color else 0)
+
+
+def insufficient_material(board):
+    """``board.is_insufficient_material()`` con una salida rápida si quedan peones, torres o damas."""
+    return not (board.pawns | board.rooks | board.queens) and board.is_insufficient_material()
+
+
+def castling_key(castling_rights):
+    key = _castling_cache.get(castling_rights)
+    if key is None:
+        key = 0
+        for mask, value in _CASTLING_KEYS:
+            if castling_rights & mask:
+                key ^= value
+        _castling_cache[castling_rights] = key
+    return key
+
+
+class SearchBoard(chess.Board):
+    """
+    Tablero para la búsqueda que mantiene de forma incremental la clave Zobrist
+    y la suma de una tabla pieza-casilla (``psqt``, positiva para las blancas).
+
+    La clave coincide con ``chess.polyglot.zobrist_hash`` en posiciones
+    alcanzadas jugando, pero solo se actualiza con ``push``/``pop``: tras
+    modificar el tablero de otra forma hay que llamar a ``refresh()``.
+    """
+
+    def __init__(self, fen=chess.STARTING_FEN, *, chess960=False, psqt=None):
+        self.psqt_table = psqt or EMPTY_PSQT
+        super().__init__(fen, chess960=chess960)
+        self.refresh()
+
+    @classmethod
+    def from_board(cls, board, psqt=None):
+        """Crea un tablero de búsqueda conservando el historial de jugadas."""
+        search_board = cls(board.root().fen(), chess960=board.chess960, psqt=psqt)
+        for move in board.move_stack:
+            search_board.push(move)
+        return search_board
+
+    def refresh(self):
+        """Recalcula desde cero el estado incremental."""
+        self._undo = []
+        self._mailbox = [-1] * 64
+        piece_key = 0
+        psqt = 0
+        for color in chess.COLORS:
+            for square in chess.scan_reversed(self.occupied_co[color]):
+                index = piece_index(self.piece_type_at(square), color)
+                self._mailbox[square] = index
+                piece_key ^= ZOBRIST[64 * index + square]
+                psqt += self.psqt_table[64 * index + square]
+        self.piece_key = piece_key
+        self.psqt = psqt
+        self.zobrist = piece_key ^ self._state_key()
+
+    def _state_key(self):
+        key = castling_key(self.castling_rights)
+        ep_square = self.ep_square
+        if ep_square is not None:
+            # Igual que Polyglot: solo cuenta si hay un peón listo para capturar
+            if self.turn == chess.WHITE:
+                ep_mask = chess.shift_down(chess.BB_SQUARES[ep_square])
+            else:
+                ep_mask = chess.shift_up(chess.BB_SQUARES[ep_square])
+            ep_mask = chess.shift_left(ep_mask) | chess.shift_right(ep_mask)
+            if ep_mask & self.pawns & self.occupied_co[self.turn]:
+                key ^= ZOBRIST[772 + chess.square_file(ep_square)]
+        if self.turn == chess.WHITE:
+            key ^= ZOBRIST[780]
+        return key
+
+    def push(self, move):
+        white, black = self.occupied_co[chess.WHITE], self.occupied_co[chess.BLACK]
+        super().push(move)
+
+        mailbox = self._mailbox
+        table = self.psqt_table
+        changes = []
+        piece_key = self.piece_key
+        psqt = self.psqt
+        changed = (white ^ self.occupied_co[chess.WHITE]) | (black ^ self.occupied_co[chess.BLACK])
+        for square in chess.scan_reversed(changed):
+            old = mailbox[square]
+            if old >= 0:
+                piece_key ^= ZOBRIST[64 * old + square]
+                psqt -= table[64 * old + square]
+            piece_type = self.piece_type_at(square)
+            if piece_type:
+                new = piece_index(piece_type, bool(self.occupied_co[chess.WHITE] & chess.BB_SQUARES[square]))
+                piece_key ^= ZOBRIST[64 * new + square]
+                psqt += table[64 * new + square]
+            else:
+                new = -1
+            mailbox[square] = new
+            changes.append((square, old))
+
+        self._undo.append((self.piece_key, self.zobrist, self.psqt, changes))
+        self.piece_key = piece_key
+        self.psqt = psqt
+        self.zobrist = piece_key ^ self._state_key()
+
+    def pop(self):
+        move = super().pop()
+        if self._undo:
+            self.piece_key, self.zobrist, self.psqt, changes = self._undo.pop()
+            mailbox = self._mailbox
+            for square, old in changes:
+                mailbox[square] = old
+        else:
+            # La jugada no pasó por este tablero (p. ej. una copia parcial)
+            self.refresh()
+        return move
+
+    def is_repetition_draw(self):
+        """
+        La posición ya se dio desde la última jugada irreversible (captura o
+        de peón), en la búsqueda o antes en la partida: compara la clave
+        Zobrist con las que guarda ``push``. Un movimiento nulo corta la
+        comparación, porque pasar el turno no repite nada.
+        """
+        undo = self._undo
+        moves = self.move_stack
+        key = self.zobrist
+        for distance in range(2, min(self.halfmove_clock, len(undo)) + 1, 2):
+            if not moves[-distance] or not moves[-distance + 1]:
+                return False
+            if undo[-distance][1] == key:
+                return True
+        return False
+
+    def is_draw(self):
+        """
+        Tablas que la búsqueda detecta sin generar jugadas: regla de los 50
+        movimientos (salvo mate), material insuficiente y repetición.
+        """
+        if self.halfmove_clock >= 100:
+            return not self.is_checkmate()
+        return insufficient_material(self) or self.is_repetition_draw()
+
+    def copy(self, *, stack=True):
+        board = super().copy(stack=stack)
+        board.psqt_table = self.psqt_table
+        board.refresh()
+        return board
+
+    def root(self):
+        board = super().root()
+        board.psqt_table = self.psqt_table
+        board.refresh()
+        return board
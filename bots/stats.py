@@ -0,0 +1,51 @@
+# bots/stats.py
+import time
+
+
+class SearchStats:
+    """
+    Resumen de una búsqueda de ``get_move``: profundidad alcanzada, valor
+    de la jugada (en centipeones, si el bot lo calcula), nodos
+    (y cuántos de quiescencia), consultas y aciertos de la tabla de
+    transposición, cortes beta, aciertos en las tablas de finales, tiempo y
+    si la jugada salió del libro, de las tablas de finales o de la caché de
+    posiciones.
+
+    Los bots lo entregan con ``BaseBot.report_stats`` al terminar.
+    """
+    __slots__ = ('depth', 'score', 'nodes', 'qnodes', 'tt_probes', 'tt_hits', 'cutoffs', 'tb_hits',
+                 'time', 'book', 'tablebase', 'cached', 'start')
+
+    def __init__(self):
+        self.depth = 0
+        self.score = None
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.tb_hits = 0
+        self.time = 0.0
+        self.book = False
+        self.tablebase = False
+        self.cached = False
+        self.start = time.perf_counter()
+
+    def finish(self):
+        self.time = time.perf_counter() - self.start
+
+    def to_dict(self):
+        return {
+            'depth': self.depth,
+            'score': self.score,
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'cutoffs': self.cutoffs,
+            'tb_hits': self.tb_hits,
+            'time': round(self.time, 3),
+            'book': self.book,
+            'tablebase': self.tablebase,
+            'cached': self.cached,
+        }
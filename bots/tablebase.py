@@ -0,0 +1,101 @@
+# bots/tablebase.py
+"""
+Tablas de finales Syzygy (WDL y DTZ) con ``chess.syzygy``.
+
+Los ficheros se abren en diferido y se mapean en memoria; ``max_fds`` acota
+cuántos quedan abiertos a la vez (los menos usados se cierran). Para probar
+basta un directorio con las tablas de 3 y 4 piezas (``KQvK.rtbw``,
+``KRvKP.rtbz``...).
+"""
+import os
+
+import chess
+import chess.syzygy
+
+# Resultados WDL desde el punto de vista del bando que mueve
+WIN = 2
+CURSED_WIN = 1
+DRAW = 0
+BLESSED_LOSS = -1
+LOSS = -2
+
+
+class Tablebase:
+    """
+    Consulta de tablas Syzygy limitada a posiciones de como mucho
+    ``max_pieces`` piezas (por defecto, las de la tabla más grande).
+    """
+
+    def __init__(self, directories, max_fds=128, max_pieces=None):
+        self.directories = [directory for directory in directories if os.path.isdir(directory)]
+        self.max_fds = max_fds
+        self.tables = chess.syzygy.Tablebase(max_fds=max_fds)
+        for directory in self.directories:
+            self.tables.add_directory(directory)
+        # "KQvKR" -> 4 piezas
+        largest = max((len(name) - 1 for name in self.tables.wdl), default=0)
+        self.max_pieces = min(max_pieces, largest) if max_pieces else largest
+
+    def __reduce__(self):
+        # Otro proceso abre sus propios ficheros
+        return Tablebase, self.config()
+
+    def __bool__(self):
+        return self.max_pieces > 0
+
+    def config(self):
+        """Argumentos para abrir las mismas tablas en otro proceso."""
+        return tuple(self.directories), self.max_fds, self.max_pieces
+
+    def covers(self, board):
+        return chess.popcount(board.occupied) <= self.max_pieces and not board.castling_rights
+
+    def probe_wdl(self, board):
+        """WDL de la posición o None si no está en las tablas."""
+        if not self.covers(board):
+            return None
+        return self.tables.get_wdl(board)
+
+    def root_move(self, board):
+        """
+        Mejor jugada según las tablas, o None si la posición no está cubierta.
+
+        Gana por el camino más corto hasta la siguiente jugada que pone a cero
+        la regla de los 50 movimientos (DTZ) y, si pierde, resiste lo máximo.
+        """
+        if not self.covers(board):
+            return None
+        best_key, best_move = None, None
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                wdl = self.tables.get_wdl(board)
+                dtz = self.tables.get_dtz(board)
+                halfmove_clock = board.halfmove_clock
+            finally:
+                board.pop()
+            if wdl is None or dtz is None:
+                return None
+            # Una victoria que no llega a poner a cero antes de la regla de los
+            # 50 movimientos es tablas
+            if wdl == LOSS and halfmove_clock + abs(dtz) > 100:
+                wdl = BLESSED_LOSS
+            # Tras la jugada el valor es del rival: menos es mejor para nosotros
+            key = (-wdl, dtz)
+            if best_key is None or key > best_key:
+                best_key, best_move = key, move
+        return best_move
+
+    def close(self):
+        self.tables.close()
+
+
+def open_tablebase(path, max_fds=128, max_pieces=None):
+    """
+    Abre las tablas de ``path`` (directorios separados por ``os.pathsep``).
+    Devuelve None si no hay ninguna tabla.
+    """
+    if not path:
+        return None
+    tablebase = Tablebase(path.split(os.pathsep), max_fds=max_fds, max_pieces=max_pieces)
+    return tablebase if tablebase else None
@@ -0,0 +1,117 @@
+# bots/time_manager.py
+"""
+Gestión del tiempo de búsqueda.
+
+El presupuesto de cada jugada sale del reloj de la partida (tiempo restante
+e incremento del bando que mueve, en un ``chess.engine.Limit``), del número
+de jugada y de la complejidad de la posición. Tiene dos límites:
+
+- ``soft``: pasado este tiempo no se empieza otra iteración, porque una
+  iteración más suele costar más que todas las anteriores juntas.
+- ``hard``: la búsqueda se corta (``SearchTimeout``) aunque esté a medias.
+
+Sin reloj se usa un presupuesto fijo por jugada, como ``Limit(time=...)``.
+``Limit(nodes=...)`` corta además la búsqueda por nodos (``node_limit``),
+que a diferencia del tiempo da partidas reproducibles. Un límite con solo
+profundidad o nodos no tiene tiempo: la búsqueda llega a donde pide.
+"""
+import time
+
+import chess
+
+# Segundos reservados en cada jugada para la latencia del servidor y la red
+MOVE_OVERHEAD = 0.05
+# Duración esperada de una partida (jugadas completas) para repartir el reloj
+EXPECTED_GAME_LENGTH = 60
+MIN_MOVES_TO_GO = 20
+# El límite duro nunca pasa de esta fracción del tiempo restante
+MAX_CLOCK_FRACTION = 0.2
+MIN_BUDGET = 0.02
+# Profundidad máxima de una búsqueda sin límite de profundidad ni de tiempo
+# (``go infinite``, nodos); las tablas de la búsqueda llegan a 64 plies
+MAX_DEPTH = 64
+
+
+class SearchTimeout(Exception):
+    """Se lanza dentro de la búsqueda cuando se agota el tiempo de la jugada."""
+
+
+class TimeBudget:
+    """Límites blando y duro de una búsqueda, como instantes de ``time.time()``."""
+    __slots__ = ('start', 'soft', 'hard')
+
+    def __init__(self, soft, hard):
+        self.start = time.time()
+        self.soft = self.start + soft
+        self.hard = self.start + hard
+
+    def __repr__(self):
+        return f"TimeBudget(soft={self.soft - self.start:.3f}, hard={self.hard - self.start:.3f})"
+
+
+def clock(board, limit):
+    """Tiempo restante e incremento del bando que mueve, o (None, 0) sin reloj."""
+    if limit is None:
+        return None, 0.0
+    if board.turn == chess.WHITE:
+        return limit.white_clock, limit.white_inc or 0.0
+    return limit.black_clock, limit.black_inc or 0.0
+
+
+def complexity(board):
+    """
+    Factor entre 0.7 y 1.5 según las jugadas legales y si hay jaque. Con una
+    sola jugada legal no hay nada que pensar.
+    """
+    moves = board.legal_moves.count()
+    if moves <= 1:
+        return 0.0
+    factor = 0.7 + 0.6 * min(moves, 40) / 40
+    if board.is_check():
+        factor += 0.2
+    return factor
+
+
+def allocate(board, limit=None, default=None):
+    """
+    Presupuesto para buscar en ``board``.
+
+    ``default`` son los segundos por jugada cuando ``limit`` no trae reloj
+    ni profundidad ni nodos; ``None`` significa sin límite de tiempo.
+    """
+    remaining, increment = clock(board, limit)
+    if limit is not None and limit.time is not None:
+        move_time = max(MIN_BUDGET, limit.time - MOVE_OVERHEAD)
+        return TimeBudget(move_time / 2, move_time)
+    if remaining is None:
+        if default is None or limit is not None and (limit.depth or limit.nodes):
+            return TimeBudget(float('inf'), float('inf'))
+        return TimeBudget(default / 2, default)
+
+    moves_to_go = (limit.remaining_moves if limit.remaining_moves
+                   else max(MIN_MOVES_TO_GO, EXPECTED_GAME_LENGTH - board.fullmove_number))
+    target = (remaining / moves_to_go + 0.75 * increment) * complexity(board)
+    available = max(MIN_BUDGET, min(remaining * MAX_CLOCK_FRACTION + increment, remaining) - MOVE_OVERHEAD)
+    hard = max(MIN_BUDGET, min(2 * target, available))
+    return TimeBudget(min(target / 2, hard), hard)
+
+
+def node_limit(limit):
+    """Nodos máximos de la búsqueda (``limit.nodes``) o infinito."""
+    if limit is not None and limit.nodes:
+        return limit.nodes
+    return float('inf')
+
+
+def depth_limit(limit, default):
+    """
+    Profundidad máxima: la de ``limit.depth`` si la trae; sin ella, ``default``
+    salvo que la búsqueda no tenga tiempo (solo nodos o tiempo infinito), que
+    sigue hasta ``MAX_DEPTH``.
+    """
+    if limit is not None and limit.depth:
+        return min(limit.depth, MAX_DEPTH)
+    if limit is not None and (limit.time == float('inf') or limit.nodes and limit.time is None
+                              and limit.white_clock is None and limit.black_clock is None):
+        return MAX_DEPTH
+    return default
@@ -0,0 +1,305 @@
+# bots/tournament.py
+"""
+Torneo entre dos bots para medir si un cambio cuesta fuerza.
+
+Juega partidas en paralelo (un bot de cada tipo por proceso del pool) desde
+un conjunto de aperturas, cada una dos veces con los colores cambiados, con
+tiempo o nodos fijos por jugada. Estima la diferencia de Elo del primer
+jugador con un intervalo del 95% y, con ``--sprt``, para en cuanto el test
+de razón de probabilidades secuencial (SPRT) decide::
+
+    python -m bots.tournament ricardo elena --games 200 --movetime 0.1
+    python -m bots.tournament ricardo ricardo-razoring --nodes 20000 --sprt -10 0 --pgn razoring.pgn
+
+Un jugador es el nombre de un bot seguido opcionalmente de ``-opción`` o
+``+opción`` para apagar o encender atributos booleanos del bot (p. ej. las
+técnicas de ``SEARCH_FEATURES`` de Ricardo o ``batch_leaves`` de Elena).
+
+Como en el banco de pruebas, no hay pausa de ``think_time`` (la aplica el
+cliente) y los libros de aperturas están desactivados salvo con ``--book``.
+Con ``--sprt`` termina con código 1 si se acepta H0 (el primer jugador no
+llega a ``ELO1`` de ventaja y se queda en ``ELO0`` o menos).
+"""
+import argparse
+import io
+import math
+import os
+import re
+import sys
+from concurrent.futures import as_completed
+
+import chess
+import chess.engine
+import chess.pgn
+
+from . import BOTS
+from .opening_book import OpeningBook
+from .process_pool import process_pool, worker_state
+
+# Aperturas por defecto (SAN desde la posición inicial)
+OPENINGS = [
+    'e4 e5 Nf3 Nc6 Bb5',  # Española
+    'e4 e5 Nf3 Nc6 Bc4',  # Italiana
+    'e4 c5 Nf3 d6',  # Siciliana
+    'e4 c5 Nc3 Nc6',  # Siciliana cerrada
+    'e4 e6 d4 d5',  # Francesa
+    'e4 c6 d4 d5',  # Caro-Kann
+    'd4 d5 c4 e6',  # Gambito de dama rehusado
+    'd4 d5 c4 c6',  # Eslava
+    'd4 Nf6 c4 g6 Nc3 Bg7',  # India de rey
+    'd4 Nf6 c4 e6 Nc3 Bb4',  # Nimzoindia
+    'c4 e5 Nc3 Nf6',  # Inglesa
+    'Nf3 d5 g3 Nf6',  # Réti
+]
+
+# Sin resultado tras tantas jugadas (de los dos bandos) la partida es tablas
+MAX_PLIES = 300
+
+def create_player(spec, book=False):
+    """Bot de la especificación ``nombre[-opción|+opción...]``."""
+    name, *toggles = re.split(r'(?=[+-])', spec)
+    if name not in BOTS:
+        raise ValueError(f"Unknown bot: {name}")
+    bot = BOTS[name]()
+    for toggle in toggles:
+        option = toggle[1:]
+        if not isinstance(getattr(bot, option, None), bool):
+            raise ValueError(f"{name} has no option {option}")
+        setattr(bot, option, toggle[0] == '+')
+    if not book:
+        bot.opening_book = OpeningBook()
+    bot.set_node_counters(False)
+    return bot
+
+
+def load_openings(path=None):
+    """
+    Tableros de inicio. ``path`` puede ser un PGN (línea principal de cada
+    partida) o un fichero de texto con un FEN/EPD o una línea en SAN por fila.
+    """
+    if path is None:
+        lines = OPENINGS
+    elif path.endswith('.pgn'):
+        with open(path) as file:
+            boards = []
+            while (game := chess.pgn.read_game(file)) is not None:
+                boards.append(game.end().board())
+            return boards
+    else:
+        with open(path) as file:
+            lines = [line.strip() for line in file if line.strip() and not line.startswith('#')]
+    boards = []
+    for line in lines:
+        if '/' in line:
+            try:
+                board = chess.Board(line)
+            except ValueError:
+                board, _ = chess.Board.from_epd(line)
+        else:
+            board = chess.Board()
+            for san in line.split():
+                board.push_san(san)
+        boards.append(board)
+    return boards
+
+
+def play_game(white, black, opening, limit, max_plies=MAX_PLIES):
+    """
+    Juega una partida desde ``opening`` (con su historial) y devuelve el
+    tablero final y el resultado (``1-0``, ``0-1`` o ``1/2-1/2``).
+    """
+    bots = {chess.WHITE: white.new_game(), chess.BLACK: black.new_game()}
+    board = opening.copy()
+    start = len(board.move_stack)
+    while not board.is_game_over(claim_draw=True):
+        if len(board.move_stack) - start >= max_plies:
+            return board, '1/2-1/2'
+        board.push(bots[board.turn].get_move(board, limit=limit))
+    return board, board.result(claim_draw=True)
+
+
+def game_pgn(board, opening, result, white, black, round_number):
+    """PGN de la partida; las jugadas de la apertura forman parte de ella."""
+    game = chess.pgn.Game.from_board(board)
+    game.headers.update(Event='flask-chess tournament', Round=str(round_number), White=white, Black=black,
+                        Result=result, Opening=' '.join(move.uci() for move in opening.move_stack))
+    if result == '1/2-1/2' and not board.is_game_over(claim_draw=True):
+        game.headers['Termination'] = 'adjudication'
+    output = io.StringIO()
+    print(game, file=output, end='\n\n')
+    return output.getvalue()
+
+
+def _create_players(specs, book):
+    # Bots de cada proceso del pool, por especificación de jugador
+    return {spec: create_player(spec, book) for spec in specs}
+
+
+def _play_game(round_number, white, black, opening, limit, max_plies):
+    players = worker_state()
+    board, result = play_game(players[white], players[black], opening, limit, max_plies)
+    return {'round': round_number, 'white': white, 'black': black, 'result': result,
+            'plies': len(board.move_stack) - len(opening.move_stack),
+            'pgn': game_pgn(board, opening, result, white, black, round_number)}
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_elo(score):
+    if score <= 0:
+        return float('-inf')
+    if score >= 1:
+        return float('inf')
+    return 400 * math.log10(score / (1 - score))
+
+
+def score_stats(wins, draws, losses):
+    """Puntuación media y varianza por partida."""
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return score, variance
+
+
+def elo_estimate(wins, draws, losses):
+    """Diferencia de Elo y su intervalo de confianza del 95%: (elo, mínimo, máximo)."""
+    games = wins + draws + losses
+    score, variance = score_stats(wins, draws, losses)
+    margin = 1.96 * math.sqrt(variance / games)
+    return score_elo(score), score_elo(score - margin), score_elo(score + margin)
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """
+    Logaritmo de la razón de verosimilitudes de H1 (``elo1``) frente a H0
+    (``elo0``) con la aproximación normal del SPRT generalizado.
+    """
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    score, variance = score_stats(wins, draws, losses)
+    if variance == 0:
+        return 0.0
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def sprt_bounds(alpha, beta):
+    """Límites (aceptar H0, aceptar H1) del LLR para los errores ``alpha`` y ``beta``."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def schedule(player_a, player_b, games, openings):
+    """(ronda, blancas, negras, apertura): cada apertura dos veces con los colores cambiados."""
+    for index in range(games):
+        opening = openings[(index // 2) % len(openings)]
+        white, black = (player_a, player_b) if index % 2 == 0 else (player_b, player_a)
+        yield index + 1, white, black, opening
+
+
+def run_tournament(player_a, player_b, games, limit, openings, workers=1, max_plies=MAX_PLIES,
+                   book=False, sprt=None, on_game=None):
+    """
+    Juega hasta ``games`` partidas y devuelve el resumen desde el punto de
+    vista de ``player_a``. ``sprt`` es (elo0, elo1, alpha, beta);
+    ``on_game(result, summary)`` recibe cada partida terminada.
+    """
+    # Validar las especificaciones antes de arrancar el pool
+    for spec in (player_a, player_b):
+        create_player(spec, book)
+    counts = {'wins': 0, 'draws': 0, 'losses': 0}
+    summary = {'player_a': player_a, 'player_b': player_b, 'games': 0, **counts, 'sprt': None}
+    with process_pool(workers, _create_players, (player_a, player_b), book) as executor:
+        futures = [executor.submit(_play_game, *game, limit, max_plies)
+                   for game in schedule(player_a, player_b, games, openings)]
+        for future in as_completed(futures):
+            result = future.result()
+            if result['result'] == '1/2-1/2':
+                counts['draws'] += 1
+            # Las rondas impares las juega ``player_a`` con blancas (ver ``schedule``)
+            elif (result['result'] == '1-0') == (result['round'] % 2 == 1):
+                counts['wins'] += 1
+            else:
+                counts['losses'] += 1
+            summary.update(counts, games=sum(counts.values()))
+            summary['elo'] = elo_estimate(**counts)
+            if sprt is not None:
+                elo0, elo1, alpha, beta = sprt
+                llr = sprt_llr(counts['wins'], counts['draws'], counts['losses'], elo0, elo1)
+                lower, upper = sprt_bounds(alpha, beta)
+                summary['llr'] = (llr, lower, upper)
+                if llr <= lower:
+                    summary['sprt'] = 'H0'
+                elif llr >= upper:
+                    summary['sprt'] = 'H1'
+            if on_game is not None:
+                on_game(result, summary)
+            if summary['sprt'] is not None:
+                # Las partidas en curso terminan; las pendientes no se juegan
+                executor.shutdown(wait=True, cancel_futures=True)
+                break
+    return summary
+
+
+def format_summary(summary):
+    elo, low, high = summary['elo']
+    line = (f"{summary['player_a']} vs {summary['player_b']}: +{summary['wins']} ={summary['draws']} "
+            f"-{summary['losses']} ({summary['games']} partidas), Elo {elo:+.1f} [{low:+.1f}, {high:+.1f}]")
+    if 'llr' in summary:
+        llr, lower, upper = summary['llr']
+        line += f", LLR {llr:.2f} [{lower:.2f}, {upper:.2f}]"
+        if summary['sprt']:
+            line += f" -> {summary['sprt']}"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneo entre dos bots con estimación de Elo y SPRT")
+    parser.add_argument('players', nargs=2, help="bots, p. ej. ricardo o ricardo-null_move")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--movetime', type=float, help="segundos por jugada (0.1 sin otro límite)")
+    parser.add_argument('--nodes', type=int, help="nodos por jugada")
+    parser.add_argument('--depth', type=int, help="profundidad máxima por jugada")
+    parser.add_argument('--openings', help="PGN o fichero con un FEN/EPD o una línea SAN por fila")
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES, help="tablas tras tantas jugadas")
+    parser.add_argument('--book', action='store_true', help="deja usar los libros de aperturas")
+    parser.add_argument('--pgn', help="fichero donde añadir las partidas")
+    parser.add_argument('--sprt', nargs=2, type=float, metavar=('ELO0', 'ELO1'),
+                        help="para en cuanto el SPRT acepta H0 (ELO0) o H1 (ELO1)")
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be positive")
+
+    movetime = args.movetime
+    if movetime is None and args.nodes is None and args.depth is None:
+        movetime = 0.1
+    limit = chess.engine.Limit(time=movetime, nodes=args.nodes, depth=args.depth)
+    sprt = (*args.sprt, args.alpha, args.beta) if args.sprt else None
+    pgn = open(args.pgn, 'a') if args.pgn else None
+
+    def on_game(result, summary):
+        print(f"{result['round']:>4} {result['white']} - {result['black']} {result['result']:<7} | "
+              + format_summary(summary), flush=True)
+        if pgn is not None:
+            pgn.write(result['pgn'])
+            pgn.flush()
+
+    try:
+        summary = run_tournament(*args.players, args.games, limit, load_openings(args.openings), args.workers,
+                                 args.max_plies, args.book, sprt, on_game)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        if pgn is not None:
+            pgn.close()
+    print(format_summary(summary))
+    return 1 if summary['sprt'] == 'H0' else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# bots/transposition.py
+from array import array
+
+from .packed_move import pack, unpack
+
+# Tipos de cota almacenados junto a cada valor
+EXACT = 0
+LOWER = 1  # El valor real es >= score (corte beta)
+UPPER = 2  # El valor real es <= score (no superó alpha)
+
+
+class TranspositionTable:
+    """
+    Tabla de transposición de tamaño fijo indexada por la clave Zobrist.
+
+    Cada ranura guarda clave, profundidad, tipo de cota, valor, mejor jugada
+    (empaquetada en 16 bits) y la generación (búsqueda) en que se escribió:
+    17 bytes por entrada en arrays, sin objetos de Python. Al colisionar se
+    reemplaza la entrada si es de una búsqueda anterior o si la nueva es
+    igual de profunda o más.
+    """
+
+    def __init__(self, size=1 << 20, counters=True):
+        # Redondear a potencia de dos para indexar con una máscara
+        size = 1 << max(0, int(size).bit_length() - 1)
+        self.size = size
+        self.mask = size - 1
+        # Repetir un array de un elemento no crea un bytes temporal del mismo
+        # tamaño (el pico de memoria al crear la tabla sería el doble)
+        self.keys = array('Q', [0]) * size
+        self.depths = array('b', [-1]) * size
+        self.flags = array('B', [0]) * size
+        self.ages = array('B', [0]) * size
+        self.scores = array('i', [0]) * size
+        self.moves = array('H', [0]) * size
+        self.generation = 0
+        # Estadísticas para medir la tasa de aciertos
+        self.probes = 0
+        self.hits = 0
+        self.set_counters(counters)
+
+    def set_counters(self, enabled):
+        """
+        Sin contadores ``probe`` es directamente la versión que no cuenta, así
+        que no se paga ni la comprobación de la opción.
+        """
+        self.counters = enabled
+        if enabled:
+            self.probe = self.counted_probe
+        else:
+            self.__dict__.pop('probe', None)
+
+    def new_search(self):
+        """Marca el inicio de una búsqueda para envejecer las entradas previas."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """Devuelve (profundidad, cota, valor, jugada) o None si no hay entrada."""
+        index = key & self.mask
+        if self.keys[index] != key or self.depths[index] < 0:
+            return None
+        return self.depths[index], self.flags[index], self.scores[index], unpack(self.moves[index])
+
+    def counted_probe(self, key):
+        index = key & self.mask
+        self.probes += 1
+        if self.keys[index] != key or self.depths[index] < 0:
+            return None
+        self.hits += 1
+        return self.depths[index], self.flags[index], self.scores[index], unpack(self.moves[index])
+
+    def store(self, key, depth, flag, score, move):
+        index = key & self.mask
+        old_depth = self.depths[index]
+        move = pack(move)
+        if self.keys[index] == key:
+            # Misma posición: conservar la jugada si la nueva entrada no trae una
+            if not move:
+                move = self.moves[index]
+            if depth < old_depth and flag != EXACT:
+                return
+        elif old_depth > depth and self.ages[index] == self.generation:
+            return
+
+        self.keys[index] = key
+        self.depths[index] = max(0, min(depth, 127))
+        self.flags[index] = flag
+        self.ages[index] = self.generation
+        self.scores[index] = int(score)
+        self.moves[index] = move
+
+    def best_move(self, key):
+        index = key & self.mask
+        if self.keys[index] == key and self.depths[index] >= 0:
+            return unpack(self.moves[index])
+        return None
+
+    def memory(self):
+        """Bytes que ocupan las ranuras de la tabla."""
+        return sum(column.itemsize * len(column) for column in
+                   (self.keys, self.depths, self.flags, self.ages, self.scores, self.moves))
+
+    def __len__(self):
+        return self.size - self.depths.count(-1)
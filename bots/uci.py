@@ -0,0 +1,266 @@
+# bots/uci.py
+"""
+Adaptador UCI: cualquier bot como motor independiente.
+
+    python -m bots.uci --bot ricardo
+
+Lee órdenes UCI por la entrada estándar y contesta por la salida estándar,
+así los bots se pueden usar desde GUIs, cutechess-cli o ``chess.engine``
+(ver ``engine_pool``). La búsqueda corre en un hilo aparte para atender
+``stop`` y ``ponderhit`` mientras piensa; cada iteración se publica como una
+línea ``info`` con profundidad, valor, nodos, nps y variante principal.
+
+Con ``go ponder`` (o ``go infinite``) el bot busca sin límite de tiempo y no
+contesta hasta ``stop``. En ``ponderhit`` la búsqueda de ponder se para y se
+empieza la de verdad con el reloj recibido, que encuentra la tabla de
+transposición ya llena.
+"""
+import argparse
+import sys
+import threading
+
+import chess
+import chess.engine
+
+from . import BOTS
+from .position_cache import open_position_cache
+from .ricardo import ENGINE_VERSION, MATE_BOUND, MATE_SCORE, RicardoBot
+from .tablebase import open_tablebase
+
+# Sin reloj ni ``movetime`` en ``go ponder``/``go infinite``
+INFINITE = chess.engine.Limit(time=float('inf'))
+
+# Origen de la jugada, publicado como ``info string`` (ver ``SearchStats``)
+MOVE_SOURCES = ('book', 'tablebase', 'cached')
+
+
+def create_bot(name, hash_size=1 << 18, tablebase=None, position_cache=None):
+    if name == 'ricardo':
+        # El motor juega siempre con la tabla de partida (``new_game``)
+        return RicardoBot(hash_size=hash_size, game_hash_size=hash_size,
+                          tablebase=tablebase, position_cache=position_cache)
+    return BOTS[name]()
+
+
+def parse_go(args):
+    """
+    Argumentos de ``go`` como (``Limit``, ponder, infinite). Los tiempos de
+    UCI van en milisegundos.
+    """
+    values = {}
+    flags = set()
+    tokens = iter(args)
+    for token in tokens:
+        if token in ('ponder', 'infinite'):
+            flags.add(token)
+        elif token in ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'movetime', 'depth', 'nodes', 'mate'):
+            values[token] = int(next(tokens, 0))
+        # searchmoves y cualquier otra opción se ignoran
+    seconds = lambda name: values[name] / 1000 if name in values else None
+    limit = chess.engine.Limit(
+        time=seconds('movetime'),
+        depth=values.get('depth'),
+        nodes=values.get('nodes'),
+        white_clock=seconds('wtime'),
+        black_clock=seconds('btime'),
+        white_inc=seconds('winc'),
+        black_inc=seconds('binc'),
+        remaining_moves=values.get('movestogo'),
+    )
+    return limit, 'ponder' in flags, 'infinite' in flags
+
+
+def parse_position(args):
+    """``position startpos|fen <FEN> [moves ...]`` como tablero con historial."""
+    if 'moves' in args:
+        index = args.index('moves')
+        args, moves = args[:index], args[index + 1:]
+    else:
+        moves = []
+    if args[:1] == ['startpos']:
+        board = chess.Board()
+    elif args[:1] == ['fen']:
+        board = chess.Board(' '.join(args[1:]))
+    else:
+        raise ValueError("expected startpos or fen")
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+
+def mate_in(score):
+    """
+    Jugadas (no plies) hasta el mate de un valor ``>= MATE_BOUND``, con el
+    signo del valor, como en ``score mate`` de UCI.
+    """
+    moves = max(1, (MATE_SCORE - abs(score) + 1) // 2)
+    return moves if score > 0 else -moves
+
+
+def mate_score(moves):
+    """Inversa de ``mate_in``: el valor de Ricardo de un mate en ``moves`` jugadas."""
+    if moves > 0:
+        return MATE_SCORE - (2 * moves - 1)
+    return -MATE_SCORE - 2 * moves
+
+
+def format_info(info):
+    """Dict de ``on_info`` como línea ``info`` de UCI."""
+    parts = ['info', 'depth', str(info['depth'])]
+    score = info.get('score')
+    if score is not None and abs(score) >= MATE_BOUND:
+        parts += ['score', 'mate', str(mate_in(score))]
+    elif score is not None:
+        parts += ['score', 'cp', str(int(score))]
+    nodes = info.get('nodes')
+    elapsed = info.get('time')
+    if nodes is not None:
+        parts += ['nodes', str(nodes)]
+        nps = info.get('nps')
+        if nps is None and elapsed:
+            nps = int(nodes / elapsed)
+        if nps is not None:
+            parts += ['nps', str(nps)]
+    if elapsed is not None:
+        parts += ['time', str(int(elapsed * 1000))]
+    if info.get('pv'):
+        parts += ['pv'] + info['pv']
+    return ' '.join(parts)
+
+
+class Search(threading.Thread):
+    """
+    Una búsqueda del bot en segundo plano. En modo ``infinite`` (también el
+    ponder) no contesta ``bestmove`` hasta que la paran, como pide UCI.
+    """
+
+    def __init__(self, engine, board, limit, infinite=False):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.board = board
+        self.limit = limit
+        self.infinite = infinite
+        self.stop_event = threading.Event()
+        self.report = True
+
+    def run(self):
+        bot = self.engine.bot
+        move = None
+        if any(self.board.legal_moves):
+            move = bot.get_move(self.board, limit=self.limit, stop_event=self.stop_event,
+                                on_info=self.engine.send_info)
+            stats = bot.last_stats
+            for source in MOVE_SOURCES:
+                if stats is not None and getattr(stats, source):
+                    self.engine.send(f'info string {source}')
+        if self.infinite:
+            self.stop_event.wait()
+        if self.report:
+            self.engine.send_bestmove(self.board, move)
+
+    def stop(self, report=True):
+        self.report = report
+        self.stop_event.set()
+        self.join()
+
+
+class UciEngine:
+    """Estado del motor UCI: bot de la partida, posición y búsqueda en curso."""
+
+    def __init__(self, bot, output=None):
+        self.template = bot
+        self.bot = bot.new_game()
+        self.board = chess.Board()
+        self.output = output or sys.stdout
+        self.output_lock = threading.Lock()
+        self.search = None
+        # Límite real de la jugada mientras se hace ponder, para ``ponderhit``
+        self.ponder_limit = None
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def send_info(self, info):
+        self.send(format_info(info))
+
+    def send_bestmove(self, board, move):
+        if move is None:
+            self.send('bestmove 0000')
+            return
+        board = board.copy(stack=False)
+        board.push(move)
+        ponder = self.bot.ponder_move(board)
+        self.send(f'bestmove {move.uci()}' + (f' ponder {ponder.uci()}' if ponder else ''))
+
+    def start(self, board, limit, infinite=False):
+        self.stop_search(report=False)
+        self.search = Search(self, board, limit, infinite)
+        self.search.start()
+
+    def stop_search(self, report=True):
+        if self.search is not None:
+            self.search.stop(report)
+            self.search = None
+
+    def handle(self, line):
+        """Procesa una orden; devuelve False con ``quit``."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f'id name {self.bot.name}')
+            self.send('id author flask-chess')
+            self.send('option name Ponder type check default false')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self.stop_search(report=False)
+            self.bot = self.template.new_game()
+            self.board = chess.Board()
+        elif command == 'position':
+            try:
+                self.board = parse_position(args)
+            except ValueError as error:
+                self.send(f'info string invalid position: {error}')
+        elif command == 'go':
+            limit, ponder, infinite = parse_go(args)
+            self.ponder_limit = limit if ponder else None
+            self.start(self.board.copy(), INFINITE if ponder or infinite else limit, ponder or infinite)
+        elif command == 'ponderhit':
+            if self.ponder_limit is not None:
+                limit, self.ponder_limit = self.ponder_limit, None
+                self.start(self.board.copy(), limit)
+        elif command == 'stop':
+            self.ponder_limit = None
+            self.stop_search()
+        elif command == 'quit':
+            self.stop_search(report=False)
+            return False
+        # setoption, debug, register y órdenes desconocidas se ignoran
+        return True
+
+    def run(self, lines):
+        for line in lines:
+            if not self.handle(line):
+                return
+        self.stop_search(report=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bot de flask-chess como motor UCI")
+    parser.add_argument('--bot', choices=sorted(BOTS), required=True)
+    parser.add_argument('--hash', type=int, default=1 << 18, help="entradas de la tabla de transposición de Ricardo")
+    parser.add_argument('--syzygy', default='', help="directorios de tablas Syzygy para Ricardo")
+    parser.add_argument('--position-cache', default='', help="caché de posiciones en disco para Ricardo")
+    args = parser.parse_args(argv)
+    position_cache = open_position_cache(args.position_cache, version=ENGINE_VERSION)
+    bot = create_bot(args.bot, args.hash, open_tablebase(args.syzygy), position_cache)
+    UciEngine(bot).run(sys.stdin)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,51 @@
 # config.py
+import os
+
 GAME_MODES = {
-    'bullet': {'time': 1, 'name': 'Bullet (1 min)'},
-    'blitz': {'time': 5, 'name': 'Blitz (5 min)'},
-    'rapid': {'time': 10, 'name': 'Rapid (10 min)'}
-}
\ No newline at end of file
+    'bullet': {'time': 1, 'increment': 0, 'name': 'Bullet (1 min)'},
+    'blitz': {'time': 5, 'increment': 0, 'name': 'Blitz (5 min)'},
+    'rapid': {'time': 10, 'increment': 0, 'name': 'Rapid (10 min)'}
+}
+
+# Procesos que usa Ricardo para repartir la búsqueda (1 = sin paralelismo)
+ENGINE_WORKERS = int(os.environ.get('ENGINE_WORKERS', 1))
+
+# Partidas en memoria: máximo simultáneo y segundos sin actividad antes de desalojarlas
+MAX_SESSIONS = int(os.environ.get('MAX_SESSIONS', 1000))
+SESSION_IDLE_TIMEOUT = int(os.environ.get('SESSION_IDLE_TIMEOUT', 1800))
+
+# Búsquedas en segundo plano: hilos del pool y trabajos pendientes antes de rechazar (503)
+ENGINE_JOB_WORKERS = int(os.environ.get('ENGINE_JOB_WORKERS', 4))
+ENGINE_QUEUE_SIZE = int(os.environ.get('ENGINE_QUEUE_SIZE', 32))
+
+# Contadores por nodo de la búsqueda (para /metrics); con 0 no tienen coste
+ENGINE_NODE_COUNTERS = os.environ.get('ENGINE_NODE_COUNTERS', '1') == '1'
+
+# Tablas de finales Syzygy: directorios separados por ':' (vacío = sin tablas),
+# ficheros abiertos a la vez y máximo de piezas a consultar (0 = todas las disponibles)
+SYZYGY_PATH = os.environ.get('SYZYGY_PATH', '')
+SYZYGY_MAX_FDS = int(os.environ.get('SYZYGY_MAX_FDS', 128))
+SYZYGY_PROBE_LIMIT = int(os.environ.get('SYZYGY_PROBE_LIMIT', 0))
+
+# Caché en disco de búsquedas raíz compartida por todos los procesos (vacío = sin caché)
+# y máximo de posiciones guardadas. Las entradas van por versión del motor: un
+# cambio en la búsqueda o la evaluación no reutiliza las anteriores
+POSITION_CACHE_PATH = os.environ.get('POSITION_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'instance', 'positions.sqlite3'))
+POSITION_CACHE_SIZE = int(os.environ.get('POSITION_CACHE_SIZE', 100_000))
+
+# Análisis por lotes (/analyze/batch): procesos, segundos por posición y máximo de posiciones
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', os.cpu_count() or 1))
+ANALYSIS_MOVE_TIME = float(os.environ.get('ANALYSIS_MOVE_TIME', 1.0))
+ANALYSIS_MAX_POSITIONS = int(os.environ.get('ANALYSIS_MAX_POSITIONS', 500))
+
+# Ponder: seguir buscando en el tiempo del rival la respuesta prevista, con un
+# máximo de búsquedas de ponder simultáneas en la máquina. El máximo se reparte
+# entre todos los procesos web con cerrojos ``<PONDER_LOCK_PATH>-<n>.lock``;
+# con PONDER_LOCK_PATH vacío el máximo es por proceso
+PONDER = os.environ.get('PONDER', '1') == '1'
+PONDER_JOBS = int(os.environ.get('PONDER_JOBS', 2))
+PONDER_LOCK_PATH = os.environ.get('PONDER_LOCK_PATH', os.path.join(os.path.dirname(__file__), 'instance', 'ponder'))
+
+# Motores UCI en procesos aparte (``python -m bots.uci``): procesos por bot.
+# Con 0 los bots buscan dentro del proceso web, en los hilos de trabajos
+ENGINE_POOL_SIZE = int(os.environ.get('ENGINE_POOL_SIZE', 0))
@@ -0,0 +1,130 @@
+# engine_pool.py
+"""
+Pool de motores UCI (``python -m bots.uci``) en procesos aparte.
+
+Cada motor es un proceso de larga duración con el que se habla por tuberías
+(``chess.engine``); la búsqueda no ocupa la CPU ni el GIL de los workers web.
+Un motor atiende una búsqueda a la vez: ``play`` espera a que quede uno
+libre. Si un motor muere se sustituye por otro nuevo.
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+
+import chess.engine
+
+from bots.stats import SearchStats
+from bots.uci import mate_score
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Intervalo con el que se comprueba la cancelación mientras el motor piensa
+STOP_POLL_INTERVAL = 0.05
+
+
+def uci_command(bot_name, syzygy_path='', position_cache_path=''):
+    command = [sys.executable, '-m', 'bots.uci', '--bot', bot_name]
+    if syzygy_path:
+        command += ['--syzygy', syzygy_path]
+    if position_cache_path:
+        command += ['--position-cache', position_cache_path]
+    return command
+
+
+class EnginePool:
+    def __init__(self, command, size=1, timeout=10.0):
+        self.command = command
+        self.timeout = timeout
+        self.engines = queue.Queue()
+        # Todos los motores, libres u ocupados, para cerrarlos al salir
+        self.processes = set()
+        for _ in range(size):
+            self.engines.put(self.open())
+        # Los hilos de ``chess.engine`` no son daemon y el intérprete los
+        # espera antes de ejecutar ``atexit``: los motores se cierran en cuanto
+        # termina el hilo principal, y ``atexit`` queda para salidas sin hilos
+        threading.Thread(target=self.close_at_exit, daemon=True).start()
+        atexit.register(self.close)
+
+    def open(self):
+        engine = chess.engine.SimpleEngine.popen_uci(self.command, timeout=self.timeout, cwd=ROOT_DIR)
+        self.processes.add(engine)
+        return engine
+
+    def play(self, board, limit, stop_event=None, on_info=None):
+        """
+        Jugada del motor para ``board`` (con su historial, por las
+        repeticiones) como (jugada, ``SearchStats``). ``stop_event`` y
+        ``on_info`` funcionan como en ``BaseBot.get_move``.
+        """
+        engine = self.engines.get()
+        try:
+            return self.search(engine, board, limit, stop_event, on_info)
+        except (chess.engine.EngineError, chess.engine.EngineTerminatedError):
+            self.processes.discard(engine)
+            engine.close()
+            engine = self.open()
+            raise
+        finally:
+            self.engines.put(engine)
+
+    def search(self, engine, board, limit, stop_event, on_info):
+        stats = SearchStats()
+        finished = threading.Event()
+
+        def watch():
+            while not finished.wait(STOP_POLL_INTERVAL):
+                if stop_event.is_set():
+                    analysis.stop()
+                    return
+
+        with engine.analysis(board, limit) as analysis:
+            if stop_event is not None:
+                threading.Thread(target=watch, daemon=True).start()
+            try:
+                for info in analysis:
+                    source = info.get('string')
+                    if source in ('book', 'tablebase', 'cached'):
+                        setattr(stats, source, True)
+                    if 'depth' not in info or 'pv' not in info:
+                        continue
+                    record = self.info_dict(info)
+                    stats.depth = record['depth']
+                    stats.score = record['score']
+                    stats.nodes = record['nodes']
+                    if on_info is not None:
+                        on_info(record)
+                best = analysis.wait()
+            finally:
+                finished.set()
+        return best.move, stats
+
+    @staticmethod
+    def info_dict(info):
+        """Línea ``info`` de ``chess.engine`` como el dict de ``on_info`` de los bots."""
+        pv = [move.uci() for move in info['pv']]
+        score = info.get('score')
+        if score is not None:
+            score = score.relative
+            # ``score mate N`` vuelve a ser el valor por plies de los bots
+            score = mate_score(score.mate()) if score.is_mate() else score.score()
+        return {
+            'depth': info['depth'],
+            'score': score,
+            'move': pv[0] if pv else None,
+            'pv': pv,
+            'nodes': info.get('nodes', 0),
+            'time': info.get('time', 0.0),
+            'nps': info.get('nps', 0),
+        }
+
+    def close_at_exit(self):
+        threading.main_thread().join()
+        self.close()
+
+    def close(self):
+        for engine in list(self.processes):
+            engine.close()
+        self.processes.clear()
@@ -0,0 +1,203 @@
+# jobs.py
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin cerrojos de fichero
+    fcntl = None
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """No se aceptan más búsquedas hasta que termine alguna de las pendientes."""
+
+
+class EngineJob:
+    """
+    Una búsqueda del motor en segundo plano.
+
+    Guarda los eventos de progreso (una entrada por iteración de la
+    profundización iterativa) para servirlos por sondeo o por SSE, y un
+    ``stop_event`` que la búsqueda consulta para cancelarse de forma
+    cooperativa.
+    """
+
+    def __init__(self, game_id=None):
+        self.id = uuid.uuid4().hex
+        self.game_id = game_id
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.events = []
+        self.stop_event = threading.Event()
+        self.finished_at = None
+        self.condition = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    @property
+    def cancelled(self):
+        return self.stop_event.is_set()
+
+    def publish(self, info):
+        """Callback de progreso para ``get_move(on_info=...)``."""
+        with self.condition:
+            self.events.append(info)
+            self.condition.notify_all()
+
+    def finish(self, status, result=None, error=None):
+        with self.condition:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.monotonic()
+            self.condition.notify_all()
+
+    def wait(self, since, timeout=None):
+        """
+        Espera a que haya eventos posteriores a ``since`` o a que termine.
+        Devuelve los eventos nuevos.
+        """
+        with self.condition:
+            if len(self.events) <= since and not self.finished:
+                self.condition.wait(timeout)
+            return self.events[since:]
+
+    def join(self, timeout=None):
+        """Espera a que el trabajo termine; devuelve si ha terminado."""
+        with self.condition:
+            if not self.finished:
+                self.condition.wait_for(lambda: self.finished, timeout)
+            return self.finished
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'status': self.status}
+        if self.events:
+            data['info'] = self.events[-1]
+        if self.result is not None:
+            data['result'] = self.result
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+
+class EngineJobQueue:
+    """
+    Cola acotada de búsquedas sobre un pool de hilos.
+
+    ``submit`` lanza ``JobQueueFull`` si ya hay ``max_pending`` trabajos en
+    cola o en curso, para rechazar carga en vez de acumularla. Los trabajos
+    terminados se conservan ``retention`` segundos para que el cliente
+    recoja el resultado.
+    """
+
+    def __init__(self, workers=4, max_pending=32, retention=300):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='engine')
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def pending(self):
+        with self.lock:
+            return self._pending()
+
+    def _pending(self):
+        # Quien llama tiene ``self.lock``: ``submit`` y ``_cleanup`` cambian ``jobs``
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def submit(self, task, game_id=None):
+        """Encola ``task(job)``; su valor de retorno es el resultado del trabajo."""
+        with self.lock:
+            self._cleanup()
+            if self._pending() >= self.max_pending:
+                raise JobQueueFull()
+            job = EngineJob(game_id)
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job, task)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.stop_event.set()
+            if job.status == QUEUED:
+                job.finish(CANCELLED)
+        return job
+
+    def cancel_game(self, game_id):
+        with self.lock:
+            job_ids = [job.id for job in self.jobs.values() if job.game_id == game_id]
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def _run(self, job, task):
+        if job.finished:
+            return
+        job.status = RUNNING
+        try:
+            result = task(job)
+        except Exception as error:
+            job.finish(FAILED, error=str(error))
+            return
+        job.finish(CANCELLED if job.cancelled else DONE, result)
+
+    def _cleanup(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished and now - job.finished_at > self.retention]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+class HostSlots:
+    """
+    ``count`` plazas compartidas por todos los procesos de la máquina (p. ej.
+    los workers de gunicorn): cada plaza es un ``flock`` sobre
+    ``<prefix>-<n>.lock``. El sistema suelta el cerrojo si el proceso muere,
+    así una plaza nunca se queda ocupada. Sin ``prefix`` (o sin ``fcntl``)
+    no se limita nada entre procesos.
+    """
+
+    def __init__(self, prefix, count):
+        self.prefix = prefix if fcntl is not None else ''
+        self.count = count
+        if self.prefix:
+            os.makedirs(os.path.dirname(os.path.abspath(self.prefix)), exist_ok=True)
+
+    @contextmanager
+    def slot(self):
+        """Ocupa una plaza libre durante el bloque; da False si no queda ninguna."""
+        if not self.prefix:
+            yield True
+            return
+        for index in range(self.count):
+            file = open(f'{self.prefix}-{index}.lock', 'a')
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                file.close()
+                continue
+            try:
+                yield True
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+                file.close()
+            return
+        yield False
@@ -0,0 +1,127 @@
+# sessions.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import chess
+import chess.engine
+
+
+class GameSession:
+    """
+    Estado de una partida en el servidor: el tablero con todo su historial,
+    la instancia del bot para esta partida (con su tabla de transposición,
+    asesinas, etc.) y los relojes de ambos bandos.
+    """
+
+    def __init__(self, game_id, bot_name, bot, mode, time_limit, increment=0):
+        self.game_id = game_id
+        self.bot_name = bot_name
+        self.bot = bot
+        self.mode = mode
+        self.board = chess.Board()
+        self.increment = increment
+        self.clocks = {chess.WHITE: float(time_limit), chess.BLACK: float(time_limit)}
+        self.turn_started = time.monotonic()
+        self.last_active = self.turn_started
+        # Búsqueda en segundo plano del bot, si la hay
+        self.job = None
+        # Búsqueda en el tiempo del rival: (jugada prevista, trabajo)
+        self.ponder = None
+        # Una sola petición por partida a la vez
+        self.lock = threading.Lock()
+        # El bot de la partida no admite dos búsquedas a la vez (jugada y ponder)
+        self.engine_lock = threading.Lock()
+
+    def remaining(self, color):
+        """Segundos que le quedan a ``color``, contando el turno en curso."""
+        remaining = self.clocks[color]
+        if color == self.board.turn:
+            remaining -= max(0.0, time.monotonic() - self.turn_started)
+        return max(0.0, remaining)
+
+    def push(self, move, delay=0.0):
+        """
+        Juega ``move`` cargando el tiempo gastado al bando que mueve. El reloj
+        del rival arranca tras ``delay`` segundos, lo que tarda el cliente en
+        mostrar la jugada.
+        """
+        now = time.monotonic()
+        color = self.board.turn
+        elapsed = max(0.0, now - self.turn_started)
+        self.clocks[color] = max(0.0, self.clocks[color] - elapsed) + self.increment
+        self.board.push(move)
+        self.turn_started = now + delay
+
+    def pop(self):
+        """
+        Deshace la última jugada. El tiempo gastado no se devuelve, solo el
+        incremento; el turno del que vuelve a mover empieza ahora.
+        """
+        move = self.board.pop()
+        color = self.board.turn
+        self.clocks[color] = max(0.0, self.clocks[color] - self.increment)
+        self.turn_started = time.monotonic()
+        return move
+
+    def limit(self):
+        """Relojes de la partida como ``chess.engine.Limit`` para el bot."""
+        return chess.engine.Limit(
+            white_clock=self.remaining(chess.WHITE),
+            black_clock=self.remaining(chess.BLACK),
+            white_inc=self.increment,
+            black_inc=self.increment,
+        )
+
+    def clock_state(self):
+        return {
+            'white': int(self.remaining(chess.WHITE) * 1000),
+            'black': int(self.remaining(chess.BLACK) * 1000),
+        }
+
+
+class SessionStore:
+    """
+    Partidas activas por identificador, en orden LRU.
+
+    Se desalojan las partidas sin actividad durante ``idle_timeout`` segundos
+    y, si se supera ``max_sessions``, las usadas hace más tiempo.
+    """
+
+    def __init__(self, max_sessions=1000, idle_timeout=1800):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def create(self, bot_name, bot, mode, time_limit, increment=0):
+        session = GameSession(uuid.uuid4().hex, bot_name, bot, mode, time_limit, increment)
+        with self.lock:
+            self.sessions[session.game_id] = session
+            self._evict()
+        return session
+
+    def get(self, game_id):
+        with self.lock:
+            self._evict()
+            session = self.sessions.get(game_id)
+            if session is not None:
+                session.last_active = time.monotonic()
+                self.sessions.move_to_end(game_id)
+            return session
+
+    def remove(self, game_id):
+        with self.lock:
+            return self.sessions.pop(game_id, None)
+
+    def _evict(self):
+        now = time.monotonic()
+        while self.sessions:
+            game_id, session = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_sessions and now - session.last_active < self.idle_timeout:
+                break
+            del self.sessions[game_id]
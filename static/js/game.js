@@ -19,6 +19,42 @@ document.addEventListener('DOMContentLoaded', () => {
     let playerInterval = null;
     let botInterval = null;
     let isPlayerTurn = true;
+    let gameId = null;
+    let currentJob = null;
+
+    // Crea la partida en el servidor, que guarda el tablero y los relojes
+    function newGame() {
+        return fetch('/game/new', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                bot: botId,
+                mode: gameMode
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            gameId = data.game_id;
+        })
+        .catch(error => console.error("Error creating game:", error));
+    }
+
+    function resetGame() {
+        game.reset();
+        board.position(game.fen());
+        playerTimer = timeLimit;
+        botTimer = timeLimit;
+        isPlayerTurn = true;
+        newGame();
+    }
+
+    function syncClock(clock) {
+        if (!clock) return;
+        playerTimer = Math.ceil(clock.white / 1000);
+        botTimer = Math.ceil(clock.black / 1000);
+    }
 
     function onSnapEnd() {
         // Esta función se llama después de que una pieza es soltada
@@ -44,8 +80,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (playerTimer <= 0) {
                     clearInterval(playerInterval);
                     alert('¡Tiempo agotado! Has perdido.');
-                    game.reset();
-                    board.position(game.fen());
+                    resetGame();
                 }
             }, 1000);
         } else {
@@ -56,8 +91,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (botTimer <= 0) {
                     clearInterval(botInterval);
                     alert('¡Tiempo agotado! Has ganado.');
-                    game.reset();
-                    board.position(game.fen());
+                    resetGame();
                 }
             }, 1000);
         }
@@ -106,6 +140,9 @@ document.addEventListener('DOMContentLoaded', () => {
         startTimer();
         
         if (!isPlayerTurn) {
+            // Solo se envía la jugada del jugador en UCI; el servidor conserva la partida
+            const playerMove = moveResult.from + moveResult.to + (moveResult.promotion || '');
+
             // "Pensando" indicador
             const statusEl = document.createElement('div');
             statusEl.className = 'thinking-status';
@@ -113,34 +150,126 @@ document.addEventListener('DOMContentLoaded', () => {
             document.querySelector('.game-info').appendChild(statusEl);
             
             // Turno del bot con delay aleatorio mínimo
-            setTimeout(() => {
-                fetch('/move', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
-                        fen: game.fen(),
-                        bot: botName.toLowerCase()
-                    })
-                })
-                .then(response => response.json())
-                .then(data => {
-                    // Remover el indicador de "pensando"
-                    statusEl.remove();
-                    makeMove(data.move);
-                })
-                .catch(error => {
-                    console.error("Error getting bot move:", error);
-                    statusEl.remove();
-                    isPlayerTurn = true;
-                });
-            }, 500); // Delay mínimo para la interfaz
+            setTimeout(() => requestBotMove(playerMove, statusEl), 500); // Delay mínimo para la interfaz
         }
         
         return true;
     }
 
+    // La búsqueda del bot corre en segundo plano: /move devuelve un trabajo
+    // cuyo progreso y resultado llegan por Server-Sent Events
+    function requestBotMove(playerMove, statusEl) {
+        fetch('/move', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                game_id: gameId,
+                move: playerMove
+            })
+        })
+        .then(response => response.json().then(data => ({ status: response.status, data })))
+        .then(({ status, data }) => {
+            if (status === 202) {
+                currentJob = data.job_id;
+                followJob(data.job_id, statusEl);
+            } else {
+                // Servidor ocupado o jugada rechazada: deshacer y devolver el turno
+                console.error("Move rejected:", data.error);
+                undoPlayerMove(statusEl);
+            }
+        })
+        .catch(error => {
+            console.error("Error getting bot move:", error);
+            undoPlayerMove(statusEl);
+        });
+    }
+
+    function followJob(jobId, statusEl) {
+        if (typeof EventSource === 'undefined') {
+            pollJob(jobId, statusEl);
+            return;
+        }
+        const source = new EventSource(`/jobs/${jobId}/events`);
+        source.addEventListener('info', event => {
+            const info = JSON.parse(event.data);
+            statusEl.textContent = `${botName} está pensando... (profundidad ${info.depth})`;
+        });
+        source.addEventListener('done', event => {
+            source.close();
+            applyBotResult(JSON.parse(event.data).result, statusEl);
+        });
+        // Cancelada o fallida: el servidor ha deshecho la jugada del jugador
+        source.addEventListener('cancelled', () => {
+            source.close();
+            reloadGame(statusEl);
+        });
+        source.addEventListener('failed', () => {
+            source.close();
+            reloadGame(statusEl);
+        });
+        source.onerror = () => {
+            // Si se corta el stream, seguir por sondeo
+            source.close();
+            pollJob(jobId, statusEl);
+        };
+    }
+
+    function pollJob(jobId, statusEl) {
+        fetch(`/jobs/${jobId}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'done') {
+                applyBotResult(data.result, statusEl);
+            } else if (data.status === 'queued' || data.status === 'running') {
+                setTimeout(() => pollJob(jobId, statusEl), 500);
+            } else {
+                reloadGame(statusEl);
+            }
+        })
+        .catch(error => console.error("Error polling bot move:", error));
+    }
+
+    function applyBotResult(result, statusEl) {
+        currentJob = null;
+        // El servidor responde en cuanto calcula; la pausa de
+        // "pensamiento" se simula aquí
+        setTimeout(() => {
+            // Remover el indicador de "pensando"
+            statusEl.remove();
+            syncClock(result.clock);
+            if (result.move) makeMove(result.move);
+        }, result.display_delay_ms || 0);
+    }
+
+    function undoPlayerMove(statusEl) {
+        currentJob = null;
+        statusEl.remove();
+        game.undo();
+        board.position(game.fen());
+        isPlayerTurn = true;
+        startTimer();
+    }
+
+    // Tablero y relojes tal como los tiene el servidor
+    function reloadGame(statusEl) {
+        currentJob = null;
+        statusEl.remove();
+        fetch(`/game/${gameId}/state`)
+        .then(response => response.json())
+        .then(data => {
+            game.load(data.fen);
+            board.position(game.fen());
+            syncClock(data.clock);
+            isPlayerTurn = game.turn() === 'w';
+            if (playerInterval) clearInterval(playerInterval);
+            if (botInterval) clearInterval(botInterval);
+            startTimer();
+        })
+        .catch(error => console.error("Error reloading game:", error));
+    }
+
     function onDrop(source, target) {
         const move = {
             from: source,
@@ -168,6 +297,18 @@ document.addEventListener('DOMContentLoaded', () => {
     // Redimensionar el tablero cuando cambie el tamaño de la ventana
     window.addEventListener('resize', () => board.resize());
 
-    // Iniciar temporizadores
+    // Abandonar cancela la búsqueda en curso y libera la partida en el servidor
+    document.getElementById('resign').addEventListener('click', () => {
+        if (!gameId) return;
+        fetch(`/game/${gameId}/resign`, { method: 'POST' })
+        .catch(error => console.error("Error resigning:", error));
+        clearInterval(playerInterval);
+        clearInterval(botInterval);
+        alert('Has abandonado la partida.');
+        resetGame();
+    });
+
+    // Iniciar partida y temporizadores
+    newGame();
     startTimer();
 });
\ No newline at end of file
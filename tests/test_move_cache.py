@@ -0,0 +1,68 @@
+# tests/test_move_cache.py
+"""
+La caché de jugadas contra los conteos de perft conocidos. Todas las
+profundidades tienen transposiciones, así que además de los nodos se
+comprueba que hay entradas reutilizadas.
+"""
+import chess
+import pytest
+
+from bots.bench import cached_perft
+from bots.move_cache import MoveCache
+from bots.search_board import SearchBoard
+
+KIWIPETE = 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+ENDGAME = '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'
+CHECKS = 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8'
+
+
+def perft_case(name, fen, depth, nodes, *marks):
+    return pytest.param(fen, depth, nodes, id=name, marks=marks)
+
+
+# Los más profundos van marcados ``slow`` (``pytest -m slow``)
+PERFT_POSITIONS = [
+    perft_case('startpos', chess.STARTING_FEN, 4, 197281),
+    perft_case('kiwipete', KIWIPETE, 3, 97862),
+    perft_case('endgame', ENDGAME, 4, 43238),
+    perft_case('promotions', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1', 4, 422333),
+    perft_case('checks', CHECKS, 3, 62379),
+    perft_case('kiwipete-deep', KIWIPETE, 4, 4085603, pytest.mark.slow),
+    perft_case('endgame-deep', ENDGAME, 5, 674624, pytest.mark.slow),
+    perft_case('checks-deep', CHECKS, 4, 2103487, pytest.mark.slow),
+]
+
+
+@pytest.mark.parametrize('fen, depth, expected', PERFT_POSITIONS)
+def test_cached_perft(fen, depth, expected):
+    cache = MoveCache(1 << 16)
+    assert cached_perft(SearchBoard(fen), depth, cache) == expected
+    assert cache.hits > 0
+
+
+def test_hit_returns_same_moves():
+    cache = MoveCache()
+    board = SearchBoard()
+    moves = cache.legal_moves(board)
+    assert cache.legal_moves(board) is moves
+    assert cache.cached(board) is moves
+    assert list(moves) == list(board.generate_legal_moves())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_transposition_hits():
+    cache = MoveCache()
+    first, second = SearchBoard(), SearchBoard()
+    for uci in ('g1f3', 'g8f6', 'b1c3'):
+        first.push_uci(uci)
+    for uci in ('b1c3', 'g8f6', 'g1f3'):
+        second.push_uci(uci)
+    assert cache.legal_moves(first) is cache.legal_moves(second)
+    assert cache.hits == 1
+
+
+def test_board_without_zobrist():
+    cache = MoveCache()
+    board = chess.Board()
+    assert cache.legal_moves(board) == list(board.generate_legal_moves())
+    assert cache.hits == cache.misses == 0
@@ -0,0 +1,66 @@
+# tests/test_tablebase.py
+"""
+Consultas a tablas Syzygy locales. Necesitan las tablas de 3 y 4 piezas en
+``SYZYGY_PATH`` (directorios separados por ``os.pathsep``); sin ellas se
+saltan.
+"""
+import os
+
+import chess
+import pytest
+
+from bots.opening_book import OpeningBook
+from bots.ricardo import RicardoBot
+from bots.tablebase import DRAW, LOSS, WIN, open_tablebase
+
+REQUIRED_TABLES = ('KQvK', 'KRvK', 'KRvKR')
+
+
+@pytest.fixture(scope='module')
+def tablebase():
+    tablebase = open_tablebase(os.environ.get('SYZYGY_PATH', ''))
+    if tablebase is None or not all(name in tablebase.tables.wdl for name in REQUIRED_TABLES):
+        pytest.skip("sin tablas Syzygy de 3 y 4 piezas en SYZYGY_PATH")
+    yield tablebase
+    tablebase.close()
+
+
+def test_probe_wdl(tablebase):
+    assert tablebase.probe_wdl(chess.Board('8/8/8/4k3/8/8/8/4KQ2 w - - 0 1')) == WIN
+    assert tablebase.probe_wdl(chess.Board('8/8/8/4k3/8/8/8/4KQ2 b - - 0 1')) == LOSS
+    assert tablebase.probe_wdl(chess.Board('8/8/3rk3/8/8/3RK3/8/8 w - - 0 1')) == DRAW
+
+
+def test_probe_outside_tables(tablebase):
+    board = chess.Board()
+    assert not tablebase.covers(board)
+    assert tablebase.probe_wdl(board) is None
+    assert tablebase.root_move(board) is None
+
+
+def test_root_move_mates(tablebase):
+    board = chess.Board('k7/8/1K6/8/8/8/8/7Q w - - 0 1')
+    move = tablebase.root_move(board)
+    board.push(move)
+    assert board.is_checkmate()
+
+
+def test_root_move_keeps_the_win_fastest(tablebase):
+    board = chess.Board('8/8/8/4k3/8/8/8/4KR2 w - - 0 1')
+    results = {}
+    for move in board.legal_moves:
+        board.push(move)
+        results[move] = (tablebase.tables.get_wdl(board), tablebase.tables.get_dtz(board))
+        board.pop()
+    move = tablebase.root_move(board)
+    assert results[move][0] == LOSS
+    assert results[move][1] == max(dtz for wdl, dtz in results.values() if wdl == LOSS)
+
+
+def test_ricardo_plays_tablebase_move(tablebase):
+    bot = RicardoBot(hash_size=1 << 10, tablebase=tablebase)
+    bot.opening_book = OpeningBook()
+    board = chess.Board('k7/8/1K6/8/8/8/8/7Q w - - 0 1')
+    move = bot.get_move(board)
+    assert bot.last_stats.tablebase
+    assert move == tablebase.root_move(board)